@@ -0,0 +1,169 @@
+#!/usr/bin/python3
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""Scaling benchmarks of the kickstart support of the service.
+
+The benchmarks run the kickstart methods of the service in process with
+payloads of growing size. They require an installed Anaconda. Run them
+from the root of the repository:
+
+    python3 benchmarks/benchmark_kickstart.py --output results.json
+
+The measured steps are:
+  * generate - setup_kickstart followed by str() of the %addon section
+    the way Anaconda generates the kickstart,
+  * write_to - setup_kickstart followed by streaming of the section,
+  * parse_per_line - handle_line called with every line of the section
+    followed by handle_end the way pykickstart parses the section,
+  * parse_batch - handle_lines called with all lines of the section.
+
+The time per line of every step must not grow with the size of the payload
+more than the given tolerance allows, otherwise the benchmark fails.
+The results are written as JSON, so regressions can be tracked over time.
+"""
+
+import io
+import os
+import sys
+from types import SimpleNamespace
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+# pylint:disable=wrong-import-position
+from benchmarks.common import generate_lines, measure, create_parser, write_results
+from org_fedora_hello_world.service.hello_world import HelloWorld
+from org_fedora_hello_world.service.kickstart import HelloWorldData
+
+# The default numbers of lines of the synthetic payloads.
+DEFAULT_SIZES = [10 ** 4, 10 ** 5, 10 ** 6]
+
+# The maximal allowed ratio of the times per line of the largest and
+# the smallest payload. The linear generation stays close to 1.
+DEFAULT_TOLERANCE = 3.0
+
+# The measured steps.
+STEPS = ("generate", "write_to", "parse_per_line", "parse_batch")
+
+
+def create_kickstart_data():
+    """Create kickstart data with the %addon section of the service."""
+    return SimpleNamespace(addons=SimpleNamespace(org_fedora_hello_world=HelloWorldData()))
+
+
+def benchmark_generation(service, repeat):
+    """Measure the generation of the kickstart with the lines of the service."""
+    def _generate():
+        data = create_kickstart_data()
+        service.setup_kickstart(data)
+        return str(data.addons.org_fedora_hello_world)
+
+    def _write_to():
+        data = create_kickstart_data()
+        service.setup_kickstart(data)
+        data.addons.org_fedora_hello_world.write_to(io.StringIO())
+
+    return {
+        "generate": measure(_generate, repeat),
+        "write_to": measure(_write_to, repeat),
+    }
+
+
+def benchmark_parsing(lines, repeat):
+    """Measure the parsing of the %addon section with the given lines."""
+    def _parse_per_line():
+        data = HelloWorldData()
+        data.handle_header([], 1)
+
+        for line_number, line in enumerate(lines, 2):
+            data.handle_line(line, line_number)
+
+        data.handle_end()
+
+    def _parse_batch():
+        data = HelloWorldData()
+        data.handle_header([], 1)
+        data.handle_lines(lines, 2)
+
+    return {
+        "parse_per_line": measure(_parse_per_line, repeat),
+        "parse_batch": measure(_parse_batch, repeat),
+    }
+
+
+def check_scaling(results, steps, tolerance):
+    """Check that the time per line doesn't grow with the size.
+
+    :return: a list of error messages
+    """
+    errors = []
+    smallest, largest = results[0], results[-1]
+
+    for step in steps:
+        first = smallest[step]["min"] / smallest["lines"]
+        last = largest[step]["min"] / largest["lines"]
+
+        if first and last / first > tolerance:
+            errors.append("The time per line of {} grows {:.1f} times from {} to {} lines.".format(
+                step, last / first, smallest["lines"], largest["lines"]
+            ))
+
+    return errors
+
+
+def main():
+    """Run the benchmarks."""
+    parser = create_parser("Benchmark the kickstart support.", DEFAULT_SIZES)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="maximal growth of the time per line")
+    args = parser.parse_args()
+
+    service = HelloWorld()
+    sizes = []
+
+    for count in sorted(args.sizes):
+        lines = generate_lines(count)
+        service.set_lines(lines)
+        result = {"lines": count}
+        result.update(benchmark_generation(service, args.repeat))
+        result.update(benchmark_parsing(lines, args.repeat))
+        print("{} lines: {:.3f} s, parsed in {:.3f} s -> {:.3f} s".format(
+            count, result["generate"]["min"], result["parse_per_line"]["min"],
+            result["parse_batch"]["min"]
+        ), file=sys.stderr)
+        sizes.append(result)
+
+    errors = check_scaling(sizes, STEPS, args.tolerance)
+
+    write_results(
+        args.output,
+        repeat=args.repeat,
+        tolerance=args.tolerance,
+        sizes=sizes,
+        errors=errors
+    )
+
+    for error in errors:
+        print(error, file=sys.stderr)
+
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
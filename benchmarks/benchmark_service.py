@@ -0,0 +1,281 @@
+#!/usr/bin/python3
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""Lifecycle benchmarks of the HelloWorld D-Bus service.
+
+The benchmarks start a private dbus-daemon and run the service on it the same
+way Anaconda does. They require an installed Anaconda and dbus-daemon. Run them
+from the root of the repository:
+
+    python3 benchmarks/benchmark_service.py --output results.json
+
+The measured steps are:
+  * publish - the time from the service start to the acquired bus name,
+  * process_kickstart - ReadKickstart with a section of the given size,
+  * setup_kickstart - GenerateKickstart with the lines of the given size,
+  * lines_round_trip - SetLines followed by reading the Lines property,
+  * fd_round_trip - the same with the lines passed as sealed memory files
+    by SetLinesFromFd and GetLinesFd,
+  * install_with_tasks - InstallWithTasks and running of the returned tasks
+    into a temporary system root,
+  * install_from_source - the same with the text copied from a source file,
+  * install_from_source_reverse - the same with the reversed source file.
+
+The results are written as JSON, so regressions can be tracked over time.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from dasbus.connection import AddressedMessageBus
+from dasbus.unix import GLibClientUnix
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+# pylint:disable=wrong-import-position
+from benchmarks.common import generate_lines, summarize, measure, create_parser, \
+    write_results
+from org_fedora_hello_world.constants import HELLO_WORLD
+from org_fedora_hello_world.fd_transfer import create_sealed_memfd, read_fd
+
+# The environment variables used by Anaconda's modules.
+BUS_ADDRESS_VARIABLE = "DBUS_ANACONDA_SESSION_BUS_ADDRESS"
+CONFIG_VARIABLE = "ANACONDA_CONFIG_TMP"
+
+# The default numbers of lines of the synthetic payloads.
+DEFAULT_SIZES = [10, 1000, 100000, 1000000]
+
+# The maximal number of seconds to wait for the service or a task.
+TIMEOUT = 600
+
+
+def generate_kickstart(count):
+    """Generate a synthetic kickstart with the %addon section."""
+    return "%addon org_fedora_hello_world --reverse\n{}%end\n".format(
+        "".join(generate_lines(count))
+    )
+
+
+class PrivateBus:
+    """A private dbus-daemon with the HelloWorld service."""
+
+    def __init__(self, sysroot):
+        self._sysroot = sysroot
+        self._daemon = None
+        self._service = None
+        self._config = None
+        self.address = None
+        self.bus = None
+
+    def start_daemon(self):
+        """Start the private dbus-daemon."""
+        self._daemon = subprocess.Popen(
+            ["dbus-daemon", "--session", "--nofork", "--print-address=1"],
+            stdout=subprocess.PIPE,
+            universal_newlines=True
+        )
+        self.address = self._daemon.stdout.readline().strip()
+        self.bus = AddressedMessageBus(self.address)
+
+    def start_service(self):
+        """Start the service and return the time until it owns its name."""
+        self._config = tempfile.NamedTemporaryFile("w", suffix=".conf")
+        self._config.write("[Installation Target]\nsystem_root = {}\n".format(self._sysroot))
+        self._config.flush()
+
+        environment = dict(os.environ)
+        environment[BUS_ADDRESS_VARIABLE] = self.address
+        environment[CONFIG_VARIABLE] = self._config.name
+        environment["PYTHONPATH"] = REPOSITORY
+
+        start = time.perf_counter()
+        self._service = subprocess.Popen(
+            [sys.executable, "-m", "org_fedora_hello_world.service"],
+            env=environment
+        )
+
+        dbus = self.bus.proxy
+
+        while not dbus.NameHasOwner(HELLO_WORLD.service_name):
+            if self._service.poll() is not None:
+                raise RuntimeError("The service has failed to start.")
+
+            if time.perf_counter() - start > TIMEOUT:
+                raise RuntimeError("The service has failed to publish in time.")
+
+            time.sleep(0.001)
+
+        return time.perf_counter() - start
+
+    def stop_service(self):
+        """Stop the service."""
+        if self._service:
+            self._service.terminate()
+            self._service.wait()
+            self._service = None
+
+        if self._config:
+            self._config.close()
+            self._config = None
+
+    def stop(self):
+        """Stop the service and the daemon."""
+        self.stop_service()
+
+        if self.bus:
+            self.bus.disconnect()
+
+        if self._daemon:
+            self._daemon.terminate()
+            self._daemon.wait()
+
+    def get_proxy(self, object_path=None, **kwargs):
+        """Get a proxy of the service."""
+        return self.bus.get_proxy(
+            HELLO_WORLD.service_name,
+            object_path or HELLO_WORLD.object_path,
+            **kwargs
+        )
+
+
+def run_tasks(private_bus, task_paths):
+    """Run the tasks and wait for them to finish."""
+    for task_path in task_paths:
+        task_proxy = private_bus.get_proxy(task_path)
+        task_proxy.Start()
+        start = time.perf_counter()
+
+        while task_proxy.IsRunning:
+            if time.perf_counter() - start > TIMEOUT:
+                raise RuntimeError("The task has failed to finish in time.")
+
+            time.sleep(0.001)
+
+        task_proxy.Finish()
+
+
+def benchmark_publish(private_bus, repeat):
+    """Measure the service startup."""
+    times = []
+
+    for _ in range(repeat):
+        times.append(private_bus.start_service())
+        private_bus.stop_service()
+
+    return summarize(times)
+
+
+def measure_source(proxy, source_path, reverse, function, repeat):
+    """Measure the function with the text read from the source file."""
+    reverse_before = proxy.Reverse
+    proxy.SetReverse(reverse)
+    proxy.SetSource(source_path)
+
+    try:
+        return measure(function, repeat)
+    finally:
+        proxy.SetSource("")
+        proxy.SetReverse(reverse_before)
+
+
+def benchmark_sizes(private_bus, sysroot, sizes, repeat):
+    """Measure the service methods with payloads of growing size."""
+    results = []
+    proxy = private_bus.get_proxy()
+    fd_proxy = private_bus.get_proxy(client=GLibClientUnix)
+    hello_file_path = os.path.join(sysroot, "root", "hello_world.txt")
+    os.makedirs(os.path.dirname(hello_file_path), exist_ok=True)
+    source_file = tempfile.NamedTemporaryFile("w", suffix=".txt")
+
+    for size in sizes:
+        kickstart = generate_kickstart(size)
+        lines = generate_lines(size)
+
+        source_file.seek(0)
+        source_file.truncate()
+        source_file.writelines(lines)
+        source_file.flush()
+
+        def _round_trip():
+            proxy.SetLines(lines)
+            return proxy.Lines
+
+        def _fd_round_trip():
+            fd_proxy.SetLinesFromFd(create_sealed_memfd("".join(lines).encode("utf-8")))
+            return read_fd(fd_proxy.GetLinesFd())
+
+        def _install():
+            # Remove the file, so it isn't skipped as unchanged.
+            if os.path.exists(hello_file_path):
+                os.unlink(hello_file_path)
+
+            run_tasks(private_bus, proxy.InstallWithTasks())
+
+        result = {
+            "lines": size,
+            "bytes": len(kickstart.encode("utf-8")),
+            "process_kickstart": measure(lambda: proxy.ReadKickstart(kickstart), repeat),
+            "setup_kickstart": measure(proxy.GenerateKickstart, repeat),
+            "lines_round_trip": measure(_round_trip, repeat),
+            "fd_round_trip": measure(_fd_round_trip, repeat),
+            "install_with_tasks": measure(_install, repeat),
+            "install_from_source": measure_source(
+                proxy, source_file.name, False, _install, repeat
+            ),
+            "install_from_source_reverse": measure_source(
+                proxy, source_file.name, True, _install, repeat
+            ),
+        }
+
+        print("{lines} lines: {seconds:.3f} s".format(
+            lines=size,
+            seconds=sum(v["mean"] for v in result.values() if isinstance(v, dict))
+        ), file=sys.stderr)
+
+        results.append(result)
+
+    source_file.close()
+    return results
+
+
+def main():
+    """Run the benchmarks."""
+    parser = create_parser("Benchmark the HelloWorld service.", DEFAULT_SIZES)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as sysroot:
+        private_bus = PrivateBus(sysroot)
+
+        try:
+            private_bus.start_daemon()
+            publish = benchmark_publish(private_bus, args.repeat)
+            private_bus.start_service()
+            sizes = benchmark_sizes(private_bus, sysroot, args.sizes, args.repeat)
+        finally:
+            private_bus.stop()
+
+    write_results(args.output, repeat=args.repeat, publish=publish, sizes=sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""Import benchmarks of the HelloWorld D-Bus service.
+
+The benchmarks import the service module in fresh processes and compare
+the lazy imports of the kickstart and task modules with importing them
+before the service is published. They require an installed Anaconda.
+Run them from the root of the repository:
+
+    python3 benchmarks/benchmark_startup.py --output results.json
+
+The measured imports are:
+  * base - Anaconda's KickstartService and KickstartModuleInterface only,
+    the imports every service has to wait for,
+  * lazy - the service module that imports the kickstart and task
+    modules on the first use,
+  * eager - the service module together with the kickstart and task
+    modules, the way it was imported before.
+
+Every result contains the best import time, the number of imported modules
+and the imported pykickstart modules. The results are written as JSON, so
+regressions can be tracked over time.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+# pylint:disable=wrong-import-position
+from benchmarks.common import create_parser, write_results
+
+# The default number of fresh processes of every measurement.
+DEFAULT_REPEAT = 5
+
+# The imported modules of the measured variants.
+IMPORTS = {
+    "base": [
+        "pyanaconda.modules.common.base",
+    ],
+    "lazy": [
+        "org_fedora_hello_world.service.hello_world",
+    ],
+    "eager": [
+        "org_fedora_hello_world.service.hello_world",
+        "org_fedora_hello_world.service.kickstart",
+        "org_fedora_hello_world.service.installation",
+    ],
+}
+
+# The code run in a fresh process to measure the imports.
+MEASURE_CODE = """
+import importlib, json, sys, time
+before = set(sys.modules)
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+elapsed = time.perf_counter() - start
+modules = set(sys.modules) - before
+json.dump({
+    "time": elapsed,
+    "modules": len(modules),
+    "pykickstart": sorted(m for m in modules if m.split(".")[0] == "pykickstart"),
+}, sys.stdout)
+"""
+
+
+def measure_imports(modules, repeat):
+    """Import the modules in fresh processes and return the best result."""
+    best = None
+
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", MEASURE_CODE, *modules],
+            cwd=REPOSITORY,
+            stdout=subprocess.PIPE,
+            check=True,
+            universal_newlines=True
+        ).stdout
+
+        result = json.loads(output)
+
+        if best is None or result["time"] < best["time"]:
+            best = result
+
+    return best
+
+
+def main():
+    """Run the benchmarks."""
+    parser = create_parser("Benchmark the imports of the service.")
+    parser.set_defaults(repeat=DEFAULT_REPEAT)
+    args = parser.parse_args()
+
+    imports = {}
+
+    for name, modules in IMPORTS.items():
+        result = measure_imports(modules, args.repeat)
+        print("{}: {:.3f} s, {} modules".format(name, result["time"], result["modules"]),
+              file=sys.stderr)
+        imports[name] = result
+
+    write_results(
+        args.output,
+        repeat=args.repeat,
+        imports=imports,
+        saved=imports["eager"]["time"] - imports["lazy"]["time"]
+    )
+
+
+if __name__ == "__main__":
+    main()
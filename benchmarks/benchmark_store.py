@@ -0,0 +1,148 @@
+#!/usr/bin/python3
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""Memory and CPU benchmarks of the stores of lines.
+
+The benchmarks compare the original list of strings with the uncompressed
+line store and the compressed line stores of different methods and block
+sizes. They require an installed Anaconda. Run them from the root of the
+repository:
+
+    python3 benchmarks/benchmark_store.py --output results.json
+
+The measured values are:
+  * memory - the number of bytes allocated by the store, the size of the list
+    and its strings for the list,
+  * build - the time to create the store from the lines,
+  * page_reads - the time to read random pages of lines,
+  * write - the time to write the lines into a temporary file,
+  * write_reverse - the same with the reversed lines.
+
+The results are written as JSON, so the trade-off can be compared.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+# pylint:disable=wrong-import-position
+from benchmarks.common import generate_lines, measure, create_parser, write_results
+from org_fedora_hello_world.constants import COMPRESSION_NONE, COMPRESSION_ZLIB, \
+    COMPRESSION_LZMA, FSYNC_NONE
+from org_fedora_hello_world.service.line_store import LineStore, CompressedLineStore
+from org_fedora_hello_world.service.writer import FileWriter
+
+# The name of the baseline configuration with the lines kept in a list.
+BASELINE = "list"
+
+# The default number of lines of the synthetic payload.
+DEFAULT_SIZE = 1000000
+
+# The default sizes of compressed blocks.
+DEFAULT_BLOCK_SIZES = [64 * 1024, 256 * 1024, 1024 * 1024]
+
+# The number of random pages and the number of lines on a page.
+PAGES = 100
+PAGE_SIZE = 50
+
+
+def create_store(lines, method, block_size):
+    """Create a store of the lines."""
+    if method == BASELINE:
+        return list(lines)
+
+    if method == COMPRESSION_NONE:
+        return LineStore(lines)
+
+    return CompressedLineStore(lines, method, block_size)
+
+
+def get_list_size(lines):
+    """Get the size of the list and its strings in bytes."""
+    return sys.getsizeof(lines) + sum(sys.getsizeof(line) for line in lines)
+
+
+def benchmark_store(lines, method, block_size, directory, repeat):
+    """Measure one configuration of the store."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = create_store(lines, method, block_size)
+    build = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # The strings of the list are shared with the payload, so they
+    # are not traced. Count them the same way the list owned them.
+    if method == BASELINE:
+        memory = get_list_size(store)
+
+    pages = [random.randrange(len(lines)) for _ in range(PAGES)]
+    writer = FileWriter(os.path.join(directory, "hello_world.txt"), fsync_policy=FSYNC_NONE)
+
+    return {
+        "method": method,
+        "block_size": block_size if method not in (BASELINE, COMPRESSION_NONE) else None,
+        "memory": memory,
+        "build": build,
+        "page_reads": measure(lambda: [store[i:i + PAGE_SIZE] for i in pages], repeat),
+        "write": measure(lambda: writer.write_lines(store), repeat),
+        "write_reverse": measure(lambda: writer.write_lines(store, reverse=True), repeat),
+    }
+
+
+def main():
+    """Run the benchmarks."""
+    parser = create_parser("Benchmark the stores of lines.")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE,
+                        help="number of lines of the synthetic payload")
+    parser.add_argument("--block-sizes", type=int, nargs="+", default=DEFAULT_BLOCK_SIZES,
+                        help="sizes of compressed blocks in bytes")
+    args = parser.parse_args()
+
+    lines = generate_lines(args.size)
+    configurations = [(BASELINE, None), (COMPRESSION_NONE, None)]
+
+    for method in (COMPRESSION_ZLIB, COMPRESSION_LZMA):
+        configurations.extend((method, block_size) for block_size in args.block_sizes)
+
+    with tempfile.TemporaryDirectory() as directory:
+        stores = []
+
+        for method, block_size in configurations:
+            result = benchmark_store(lines, method, block_size, directory, args.repeat)
+            print("{method} {block_size}: {memory} bytes".format(**result), file=sys.stderr)
+            stores.append(result)
+
+    write_results(
+        args.output,
+        repeat=args.repeat,
+        lines=args.size,
+        bytes=sum(len(line.encode("utf-8")) for line in lines),
+        stores=stores
+    )
+
+
+if __name__ == "__main__":
+    main()
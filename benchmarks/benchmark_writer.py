@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""Throughput benchmarks of the writer of the hello world file.
+
+The benchmarks compare the batched atomic writer with the original writer
+that wrote the lines one by one into a text file. They require an installed
+Anaconda. Run them from the root of the repository:
+
+    python3 benchmarks/benchmark_writer.py --output results.json
+
+The measured values are in lines per second:
+  * per_line - the original writer,
+  * write - FileWriter with the lines of a line store,
+  * write_reverse - the same with the reversed lines,
+  * copy_source - FileWriter with the lines of a source file,
+    copied in the kernel if possible,
+  * copy_source_reverse - the same with the reversed source file.
+
+The results are written as JSON, so regressions can be tracked over time.
+"""
+
+import os
+import sys
+import tempfile
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+# pylint:disable=wrong-import-position
+from benchmarks.common import iterate_lines, measure, get_rate, create_parser, write_results
+from org_fedora_hello_world.constants import FSYNC_NONE
+from org_fedora_hello_world.service.line_store import LineStore
+from org_fedora_hello_world.service.source import SourceFile
+from org_fedora_hello_world.service.writer import FileWriter
+
+# The default numbers of lines of the synthetic payloads.
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+
+
+def write_per_line(path, lines):
+    """Write the lines one by one the way the original task did."""
+    with open(path, "w") as f:
+        for line in lines:
+            f.write(line)
+
+
+def benchmark_size(count, directory, repeat):
+    """Measure the writers with the given number of lines."""
+    store = LineStore(iterate_lines(count))
+    path = os.path.join(directory, "hello_world.txt")
+    writer = FileWriter(path, fsync_policy=FSYNC_NONE)
+
+    source_path = os.path.join(directory, "source.txt")
+    FileWriter(source_path, fsync_policy=FSYNC_NONE).write_lines(store)
+    source = SourceFile(source_path)
+
+    return {
+        "lines": count,
+        "bytes": store.nbytes,
+        "per_line": get_rate(count, measure(lambda: write_per_line(path, store), repeat)),
+        "write": get_rate(count, measure(lambda: writer.write_lines(store), repeat)),
+        "write_reverse": get_rate(
+            count, measure(lambda: writer.write_lines(store, reverse=True), repeat)
+        ),
+        "copy_source": get_rate(count, measure(lambda: writer.write_lines(source), repeat)),
+        "copy_source_reverse": get_rate(
+            count, measure(lambda: writer.write_lines(source, reverse=True), repeat)
+        ),
+    }
+
+
+def main():
+    """Run the benchmarks."""
+    parser = create_parser("Benchmark the writer of the hello world file.", DEFAULT_SIZES)
+    args = parser.parse_args()
+
+    sizes = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.sizes:
+            result = benchmark_size(count, directory, args.repeat)
+            print("{lines} lines: {per_line:.0f} -> {write:.0f} lines/s, "
+                  "{copy_source:.0f} lines/s from the source".format(**result),
+                  file=sys.stderr)
+            sizes.append(result)
+
+    write_results(args.output, repeat=args.repeat, sizes=sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""Shared helpers of the benchmarks."""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+# The default number of runs of every measurement.
+DEFAULT_REPEAT = 3
+
+
+def iterate_lines(count):
+    """Iterate over synthetic lines without keeping them in memory."""
+    return ("Hello world line number {}.\n".format(i) for i in range(count))
+
+
+def generate_lines(count):
+    """Generate a list of synthetic lines."""
+    return list(iterate_lines(count))
+
+
+def summarize(times):
+    """Summarize the measured times."""
+    return {
+        "min": min(times),
+        "max": max(times),
+        "mean": sum(times) / len(times),
+        "runs": len(times),
+    }
+
+
+def measure(function, repeat=DEFAULT_REPEAT):
+    """Run the function repeatedly and summarize the measured times."""
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return summarize(times)
+
+
+def get_rate(count, summary):
+    """Get the best number of items processed per second."""
+    return count / summary["min"] if summary["min"] else 0.0
+
+
+def create_parser(description, sizes=None):
+    """Create a parser of the common arguments of the benchmarks.
+
+    :param description: a description of the benchmarks
+    :param sizes: default numbers of lines of the synthetic payloads
+                  or None if the benchmarks don't use them
+    :return: an instance of ArgumentParser
+    """
+    parser = argparse.ArgumentParser(description=description)
+
+    if sizes is not None:
+        parser.add_argument("--sizes", type=int, nargs="+", default=sizes,
+                            help="numbers of lines of the synthetic payloads")
+
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="number of runs of every measurement")
+    parser.add_argument("--output", default="-",
+                        help="path to the JSON output or - for stdout")
+    return parser
+
+
+def write_results(output, **values):
+    """Write the results as JSON, so regressions can be tracked over time.
+
+    :param output: a path to the JSON output or - for stdout
+    :param values: the measured values
+    """
+    results = {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
+    results.update(values)
+
+    if output == "-":
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
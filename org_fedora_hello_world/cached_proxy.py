@@ -0,0 +1,171 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module contains the caching proxy of the addon's D-Bus service."""
+
+import logging
+
+from dasbus.signal import Signal
+from dasbus.typing import unwrap_variant
+from dasbus.unix import GLibClientUnix
+
+from org_fedora_hello_world.constants import HELLO_WORLD
+
+log = logging.getLogger(__name__)
+
+__all__ = ["CachedProxy", "get_cached_proxy"]
+
+# Properties of the service that are cached by the user interfaces.
+CACHED_PROPERTIES = ("Lines", "Reverse", "Summary")
+
+# Signals of the service that invalidate the cached properties.
+INVALIDATING_SIGNALS = {
+    "LinesEdited": ("Lines", ),
+}
+
+# Prefixes and suffixes of names of methods that don't change the state
+# of the service. The methods with tasks only create the tasks.
+READ_ONLY_PREFIXES = ("Get", "Generate")
+READ_ONLY_SUFFIXES = ("WithTask", "WithTasks")
+
+
+def is_read_only(name):
+    """Is the method with the given name read-only?
+
+    :param name: a name of a D-Bus method
+    :return: True or False
+    """
+    return name.startswith(READ_ONLY_PREFIXES) or name.endswith(READ_ONLY_SUFFIXES)
+
+
+class CachedProxy:
+    """A D-Bus proxy with cached property values.
+
+    Reading a property of a plain proxy is a D-Bus call. This wrapper
+    remembers the values of the selected properties and updates them
+    from the PropertiesChanged signal of the service. Other signals can
+    invalidate the cached values. Everything else is passed to the
+    wrapped proxy.
+
+    Read-only methods are passed to the wrapped proxy as they are. Other
+    methods can change the state of the service, so calling them drops
+    the whole cache. The cache doesn't wait for the signals in that case,
+    they are delivered after the reply. The hits and misses counters are
+    useful for debugging.
+    """
+
+    def __init__(self, proxy, properties, signals=None):
+        """Create a new caching proxy.
+
+        :param proxy: a D-Bus proxy
+        :param properties: names of properties to cache
+        :param signals: a dictionary of signal names and names of
+                        properties invalidated by the signals
+        """
+        self._proxy = proxy
+        self._properties = frozenset(properties)
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+
+        self._proxy.PropertiesChanged.connect(self._on_properties_changed)
+
+        for signal_name, names in (signals or {}).items():
+            getattr(self._proxy, signal_name).connect(
+                lambda *args, names=names: self.invalidate(*names)
+            )
+
+    @property
+    def proxy(self):
+        """The wrapped D-Bus proxy."""
+        return self._proxy
+
+    def invalidate(self, *names):
+        """Drop the cached values of the given properties.
+
+        Drop all cached values if no names are specified.
+
+        :param names: names of properties
+        """
+        if not names:
+            self._cache.clear()
+            return
+
+        for name in names:
+            self._cache.pop(name, None)
+
+    def _on_properties_changed(self, interface, changed, invalidated):
+        """Update the cache from the PropertiesChanged signal.
+
+        The changed values are variants, so they are unwrapped the same
+        way the proxy unwraps values of the properties.
+        """
+        # pylint: disable=unused-argument
+        for name, value in changed.items():
+            if name in self._properties:
+                self._cache[name] = unwrap_variant(value)
+
+        # Don't drop the whole cache if no cached property is invalidated.
+        names = [name for name in invalidated if name in self._properties]
+
+        if names:
+            self.invalidate(*names)
+
+    def _get_property(self, name):
+        """Get a value of the cached property."""
+        if name in self._cache:
+            self.hits += 1
+            return self._cache[name]
+
+        self.misses += 1
+        value = getattr(self._proxy, name)
+        self._cache[name] = value
+        log.debug("Cached property %s (%d hits, %d misses).", name, self.hits, self.misses)
+        return value
+
+    def _call_method(self, method, *args, **kwargs):
+        """Call a method that can change the state of the service."""
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self.invalidate()
+
+    def __getattr__(self, name):
+        if name in self._properties:
+            return self._get_property(name)
+
+        member = getattr(self._proxy, name)
+
+        if not callable(member) or isinstance(member, Signal) or is_read_only(name):
+            return member
+
+        return lambda *args, **kwargs: self._call_method(member, *args, **kwargs)
+
+    def __repr__(self):
+        return "{}({} hits, {} misses)".format(type(self).__name__, self.hits, self.misses)
+
+
+def get_cached_proxy():
+    """Get a caching proxy of the HelloWorld service.
+
+    The proxy supports passing of Unix file descriptors.
+
+    :return: an instance of CachedProxy
+    """
+    proxy = HELLO_WORLD.get_proxy(client=GLibClientUnix)
+    return CachedProxy(proxy, CACHED_PROPERTIES, INVALIDATING_SIGNALS)
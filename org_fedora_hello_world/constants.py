@@ -33,3 +33,73 @@ HELLO_WORLD = DBusServiceIdentifier(
 
 # It's better to store paths without the initial slash "/" because of os.path.join behavior.
 HELLO_WORLD_FILE_PATH = "root/hello_world.txt"
+
+# The encoding of the lines stored in the service and written into files.
+ENCODING = "utf-8"
+
+# The size of batches of data that are written into files with a single system call.
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Policies for synchronizing the written files with the storage device:
+#   * none - leave the synchronization to the system,
+#   * file - synchronize the file before it replaces the original file,
+#   * full - synchronize also the parent directory after the file is replaced.
+FSYNC_NONE = "none"
+FSYNC_FILE = "file"
+FSYNC_FULL = "full"
+
+# The average number of lines in chunks of the digest of lines. An edit of
+# the lines rehashes only the chunks around it.
+DIGEST_CHUNK_LINES = 256
+
+# The maximal size of chunks of the generated kickstart section.
+KICKSTART_CHUNK_SIZE = 64 * 1024
+
+# The number of lines of the parsed kickstart section stored at once.
+KICKSTART_BATCH_LINES = 1000
+
+# The maximal number of files written into the target system at the same time.
+PROVISIONING_WORKERS = 4
+
+# The installation progress is reported after the given number of written bytes
+# or after the given number of seconds, whichever comes first.
+PROGRESS_REPORT_BYTES = 16 * 1024 * 1024
+PROGRESS_REPORT_INTERVAL = 0.5
+
+# Methods of compression of the lines stored in the service:
+#   * none - keep the lines uncompressed,
+#   * zlib - compress blocks of lines with zlib, it is fast,
+#   * lzma - compress blocks of lines with lzma, it is slow but compact.
+COMPRESSION_NONE = "none"
+COMPRESSION_ZLIB = "zlib"
+COMPRESSION_LZMA = "lzma"
+
+# The size of uncompressed blocks of lines that are compressed at once.
+COMPRESSION_BLOCK_SIZE = 256 * 1024
+
+# The name of the thread that applies the lines edited in the graphical spoke.
+THREAD_HELLO_WORLD_APPLY = "AnaHelloWorldApplyThread"
+
+# The number of lines loaded into the text view of the graphical spoke at once.
+TEXT_LOAD_CHUNK_LINES = 1000
+
+# The number of lines on a page of the preview in the text spoke.
+TEXT_PREVIEW_PAGE_LINES = 20
+
+# The maximal number of messages in the validation report.
+VALIDATION_MAX_MESSAGES = 10
+
+# The maximal number of calculation tasks that run at the same time.
+CALCULATION_WORKERS = 2
+
+# The number of lines processed by a calculation task between checks of its
+# cancellation and the number of seconds between the checks while it waits.
+CALCULATION_CANCEL_CHECK_LINES = 10000
+CALCULATION_CANCEL_CHECK_INTERVAL = 0.1
+
+# The default number of lines of the reversed preview.
+REVERSE_PREVIEW_LINES = 20
+
+# The upper bounds of the buckets of the latency histograms in seconds. The
+# last bucket of every histogram counts the slower calls.
+METRICS_LATENCY_BUCKETS = (0.001, 0.01, 0.1, 1.0, 10.0)
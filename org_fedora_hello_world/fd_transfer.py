@@ -0,0 +1,137 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module contains helpers for passing payloads as file descriptors.
+
+Large payloads can be passed over D-Bus as a single Unix file descriptor
+instead of an array of strings. The payload is the encoded text of the
+lines. The D-Bus proxy has to be created with the GLibClientUnix client
+to pass file descriptors. It requires dasbus 1.7 or newer:
+
+    from dasbus.unix import GLibClientUnix
+    proxy = HELLO_WORLD.get_proxy(client=GLibClientUnix)
+    proxy.SetLinesFromFd(create_sealed_memfd(data))
+
+"""
+
+import fcntl
+import mmap
+import os
+import stat
+
+__all__ = ["create_sealed_memfd", "create_sealed_memfd_from_blocks", "read_fd"]
+
+# The name of created memory files. It is visible only in /proc.
+MEMFD_NAME = "hello-world-payload"
+
+# The size of chunks read from pipes and unsealed files.
+READ_CHUNK_SIZE = 1024 * 1024
+
+# The seals that guarantee that a mapped memory file can't be changed.
+REQUIRED_SEALS = fcntl.F_SEAL_SHRINK | fcntl.F_SEAL_WRITE
+
+
+def create_sealed_memfd(data):
+    """Create a sealed memory file with the given data.
+
+    The memory file can't be modified once it is sealed, so the receiver
+    can safely map it into memory.
+
+    :param data: a bytes-like object
+    :return: a file descriptor positioned at the start of the file
+    """
+    return create_sealed_memfd_from_blocks([data])
+
+
+def create_sealed_memfd_from_blocks(blocks):
+    """Create a sealed memory file with the given blocks of data.
+
+    :param blocks: an iterable of bytes-like objects
+    :return: a file descriptor positioned at the start of the file
+    """
+    fd = os.memfd_create(MEMFD_NAME, os.MFD_CLOEXEC | os.MFD_ALLOW_SEALING)
+
+    try:
+        for block in blocks:
+            with memoryview(block) as view:
+                while view:
+                    written = os.write(fd, view)
+                    view = view[written:]
+
+        fcntl.fcntl(
+            fd,
+            fcntl.F_ADD_SEALS,
+            fcntl.F_SEAL_SHRINK | fcntl.F_SEAL_GROW | fcntl.F_SEAL_WRITE | fcntl.F_SEAL_SEAL
+        )
+        os.lseek(fd, 0, os.SEEK_SET)
+    except BaseException:
+        os.close(fd)
+        raise
+
+    return fd
+
+
+def read_fd(fd):
+    """Read all data from the given file descriptor and close it.
+
+    Memory files sealed against shrinking and writing are mapped into
+    memory. Other file descriptors like pipes or regular files are read
+    in chunks. A mapped file that is truncated by the sender would kill
+    the service with SIGBUS.
+
+    :param fd: a file descriptor
+    :return: a bytes-like object
+    """
+    try:
+        status = os.fstat(fd)
+
+        if not stat.S_ISREG(status.st_mode) or not _is_sealed(fd):
+            return _read_chunks(fd)
+
+        if not status.st_size:
+            return b""
+
+        return mmap.mmap(fd, status.st_size, access=mmap.ACCESS_READ)
+    finally:
+        os.close(fd)
+
+
+def _is_sealed(fd):
+    """Can't the file be shrunk or written?"""
+    try:
+        seals = fcntl.fcntl(fd, fcntl.F_GET_SEALS)
+    except OSError:
+        # The file doesn't support sealing.
+        return False
+
+    return seals & REQUIRED_SEALS == REQUIRED_SEALS
+
+
+def _read_chunks(fd):
+    """Read all data from a stream."""
+    data = bytearray()
+
+    while True:
+        chunk = os.read(fd, READ_CHUNK_SIZE)
+
+        if not chunk:
+            break
+
+        data += chunk
+
+    return data
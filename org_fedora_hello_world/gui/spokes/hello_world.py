@@ -22,13 +22,19 @@
 
 import logging
 
+from gi.repository import GLib
+
+from pyanaconda.threading import threadMgr, AnacondaThread
+from pyanaconda.ui.communication import hubQ
 from pyanaconda.ui.gui import GUIObject
 from pyanaconda.ui.gui.spokes import NormalSpoke
 from pyanaconda.ui.common import FirstbootSpokeMixIn
 
 # the path to addons is in sys.path so we can import things from org_fedora_hello_world
+from org_fedora_hello_world.cached_proxy import get_cached_proxy
+from org_fedora_hello_world.constants import THREAD_HELLO_WORLD_APPLY, TEXT_LOAD_CHUNK_LINES
 from org_fedora_hello_world.categories.hello_world import HelloWorldCategory
-from org_fedora_hello_world.constants import HELLO_WORLD
+from org_fedora_hello_world.structures import HelloWorldSummary, HelloWorldConfiguration
 
 log = logging.getLogger(__name__)
 
@@ -87,9 +93,12 @@ class HelloWorldSpoke(FirstbootSpokeMixIn, NormalSpoke):
         :see: pyanaconda.ui.common.Spoke.__init__
         """
         super().__init__(*args, **kwargs)
-        self._hello_world_module = HELLO_WORLD.get_proxy()
+        self._hello_world_module = get_cached_proxy()
         self._entry = None
         self._reverse = None
+        self._lines = []
+        self._configuration = HelloWorldConfiguration()
+        self._loading = None
 
     def initialize(self):
         """
@@ -111,28 +120,123 @@ class HelloWorldSpoke(FirstbootSpokeMixIn, NormalSpoke):
 
         :see: pyanaconda.ui.common.UIObject.refresh
         """
-        lines = self._hello_world_module.Lines
-        self._entry.get_buffer().set_text("".join(lines))
+        # Wait for the previously edited lines to be applied.
+        threadMgr.wait(THREAD_HELLO_WORLD_APPLY)
+
+        self._configuration = HelloWorldConfiguration.from_structure(
+            self._hello_world_module.GetConfiguration()
+        )
+        self._lines = self._configuration.lines
+        self._start_loading(self._lines)
+        self._reverse.set_active(self._configuration.reverse)
+
+    def _start_loading(self, lines):
+        """Start loading the lines into the text view.
+
+        The lines are inserted in chunks from idle callbacks, so the main
+        loop keeps handling events. The text view is insensitive until
+        all lines are loaded.
+        """
+        self._stop_loading()
+        self._entry.get_buffer().set_text("")
+        self._entry.set_sensitive(False)
+        self.set_info(_("Loading the text..."))
+
+        chunks = (
+            lines[i:i + TEXT_LOAD_CHUNK_LINES]
+            for i in range(0, len(lines), TEXT_LOAD_CHUNK_LINES)
+        )
+        self._loading = GLib.idle_add(self._load_chunk, chunks)
+
+    def _load_chunk(self, chunks):
+        """Insert the next chunk of lines into the text view."""
+        chunk = next(chunks, None)
+
+        if chunk is not None:
+            buf = self._entry.get_buffer()
+            buf.insert(buf.get_end_iter(), "".join(chunk))
+            return GLib.SOURCE_CONTINUE
 
-        reverse = self._hello_world_module.Reverse
-        self._reverse.set_active(reverse)
+        self._loading = None
+        self._entry.set_sensitive(True)
+        self.clear_info()
+        return GLib.SOURCE_REMOVE
+
+    def _stop_loading(self):
+        """Stop loading the lines into the text view.
+
+        :return: True if the loading was in progress, otherwise False
+        """
+        if self._loading is None:
+            return False
+
+        GLib.source_remove(self._loading)
+        self._loading = None
+        self._entry.set_sensitive(True)
+        self.clear_info()
+        return True
 
     def apply(self):
         """
         The apply method that is called when the spoke is left. It should
         update the D-Bus service with values set in the GUI elements.
+
+        The text is split and sent to the D-Bus service in a separate thread,
+        so the hub stays responsive.
         """
+        reverse = self._reverse.get_active()
+
+        # The text view couldn't be edited before all lines were loaded.
+        if self._stop_loading():
+            if reverse != self._configuration.reverse:
+                self._hello_world_module.SetReverse(reverse)
+                self._configuration.reverse = reverse
+
+            return
+
         buf = self._entry.get_buffer()
         text = buf.get_text(
             buf.get_start_iter(),
             buf.get_end_iter(),
             True
         )
-        lines = text.splitlines(True)
-        self._hello_world_module.SetLines(lines)
 
-        reverse = self._reverse.get_active()
-        self._hello_world_module.SetReverse(reverse)
+        hubQ.send_not_ready(self.__class__.__name__)
+        threadMgr.add(AnacondaThread(
+            name=THREAD_HELLO_WORLD_APPLY,
+            target=self._apply_text,
+            args=(text, reverse)
+        ))
+
+    def _apply_text(self, text, reverse):
+        """Send the edited text to the D-Bus service.
+
+        This method runs in a separate thread.
+        """
+        try:
+            lines = text.splitlines(True)
+            edit = get_lines_edit(self._lines, lines)
+            configuration = self._configuration
+
+            # Make at most one call with the smallest update.
+            if edit and reverse != configuration.reverse:
+                configuration.lines = lines
+                configuration.reverse = reverse
+                configuration.source = ""
+                self._hello_world_module.SetConfiguration(
+                    HelloWorldConfiguration.to_structure(configuration)
+                )
+            elif edit:
+                self._hello_world_module.ReplaceRange(*edit)
+                configuration.lines = lines
+                configuration.source = ""
+            elif reverse != configuration.reverse:
+                self._hello_world_module.SetReverse(reverse)
+                configuration.reverse = reverse
+
+            self._lines = configuration.lines
+        finally:
+            hubQ.send_ready(self.__class__.__name__)
 
     def execute(self):
         """
@@ -151,8 +255,8 @@ class HelloWorldSpoke(FirstbootSpokeMixIn, NormalSpoke):
 
         :rtype: bool
         """
-        # this spoke is always ready
-        return True
+        # this spoke is ready unless the text is being applied
+        return not threadMgr.get(THREAD_HELLO_WORLD_APPLY)
 
     @property
     def completed(self):
@@ -163,7 +267,8 @@ class HelloWorldSpoke(FirstbootSpokeMixIn, NormalSpoke):
 
         :rtype: bool
         """
-        return bool(self._hello_world_module.Lines)
+        summary = HelloWorldSummary.from_structure(self._hello_world_module.Summary)
+        return bool(summary.line_count)
 
     @property
     def mandatory(self):
@@ -186,14 +291,17 @@ class HelloWorldSpoke(FirstbootSpokeMixIn, NormalSpoke):
 
         :rtype: str
         """
-        lines = self._hello_world_module.Lines
+        if threadMgr.get(THREAD_HELLO_WORLD_APPLY):
+            return _("Saving the text...")
 
-        if not lines:
+        summary = HelloWorldSummary.from_structure(self._hello_world_module.Summary)
+
+        if not summary.line_count:
             return _("No text added")
-        elif self._hello_world_module.Reverse:
-            return _("Text set with {} lines to reverse").format(len(lines))
+        elif summary.reverse:
+            return _("Text set with {} lines to reverse").format(summary.line_count)
         else:
-            return _("Text set with {} lines").format(len(lines))
+            return _("Text set with {} lines").format(summary.line_count)
 
     ### handlers ###
     def on_entry_icon_clicked(self, entry, *args):  # pylint: disable=unused-argument
@@ -210,6 +318,31 @@ class HelloWorldSpoke(FirstbootSpokeMixIn, NormalSpoke):
             dialog.run()
 
 
+def get_lines_edit(old_lines, new_lines):
+    """Get the smallest range edit that turns the old lines into the new ones.
+
+    :param old_lines: a list of the original lines
+    :param new_lines: a list of the edited lines
+    :return: a tuple with the first index, a number of replaced lines and
+             a list of new lines or None if the lines are the same
+    """
+    if old_lines == new_lines:
+        return None
+
+    limit = min(len(old_lines), len(new_lines))
+    start = 0
+
+    while start < limit and old_lines[start] == new_lines[start]:
+        start += 1
+
+    end = 0
+
+    while end < limit - start and old_lines[-end - 1] == new_lines[-end - 1]:
+        end += 1
+
+    return start, len(old_lines) - start - end, new_lines[start:len(new_lines) - end]
+
+
 class HelloWorldDialog(GUIObject):
     """
     Class for the sample dialog.
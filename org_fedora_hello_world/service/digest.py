@@ -0,0 +1,112 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module contains the digest of lines that is updated in place."""
+
+import hashlib
+import zlib
+from bisect import bisect_right
+from itertools import accumulate
+
+from org_fedora_hello_world.constants import DIGEST_CHUNK_LINES
+
+__all__ = ["LineDigest"]
+
+
+def _iterate_chunks(lines):
+    """Iterate over the chunks of the encoded lines.
+
+    :param lines: an iterable of encoded lines
+    :return: an iterator of tuples with a number of lines and a digest
+    """
+    digest = hashlib.sha256()
+    count = 0
+
+    for line in lines:
+        digest.update(line)
+        count += 1
+
+        if zlib.crc32(line) % DIGEST_CHUNK_LINES == 0:
+            yield count, digest.digest()
+            digest = hashlib.sha256()
+            count = 0
+
+    if count:
+        yield count, digest.digest()
+
+
+class LineDigest:
+    """A digest of encoded lines that can be updated after an edit.
+
+    The lines are split into chunks defined by their content. A chunk ends
+    after a line with a checksum divisible by DIGEST_CHUNK_LINES, so the
+    boundaries don't move when other lines are edited. An edit rehashes
+    only the chunks around it. The digest is the SHA-256 digest of the
+    SHA-256 digests of all chunks.
+    """
+
+    def __init__(self, lines=()):
+        """Create a new digest.
+
+        :param lines: an iterable of encoded lines
+        """
+        self._counts = []
+        self._digests = []
+        self._hexdigest = None
+
+        for count, digest in _iterate_chunks(lines):
+            self._counts.append(count)
+            self._digests.append(digest)
+
+    def update(self, store, start, removed, added):
+        """Update the digest after an edit of the line store.
+
+        :param store: a line store after the edit
+        :param start: an index of the first edited line
+        :param removed: a number of removed lines
+        :param added: a number of added lines
+        """
+        offsets = [0, *accumulate(self._counts)]
+        size = offsets[-1]
+
+        if not size:
+            first, last = 0, 0
+        else:
+            # Rehash the chunk before the edit, because it doesn't have to end
+            # with a boundary, and the chunk after the edit, because the edited
+            # lines don't have to end with a boundary.
+            first = bisect_right(offsets, max(start - 1, 0)) - 1
+            last = bisect_right(offsets, min(start + removed, size - 1))
+
+        begin = offsets[first]
+        end = offsets[last] + added - removed
+
+        chunks = list(_iterate_chunks(store.get_encoded(i) for i in range(begin, end)))
+        self._counts[first:last] = [count for count, _digest in chunks]
+        self._digests[first:last] = [digest for _count, digest in chunks]
+        self._hexdigest = None
+
+    def hexdigest(self):
+        """Get the digest.
+
+        :return: a hexadecimal string
+        """
+        if self._hexdigest is None:
+            self._hexdigest = hashlib.sha256(b"".join(self._digests)).hexdigest()
+
+        return self._hexdigest
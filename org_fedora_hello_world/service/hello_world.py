@@ -16,6 +16,11 @@
 # Red Hat, Inc.
 #
 import logging
+import os
+import time
+import weakref
+
+from dasbus.unix import GLibServerUnix
 
 from pyanaconda.core.configuration.anaconda import conf
 from pyanaconda.core.dbus import DBus
@@ -23,14 +28,43 @@ from pyanaconda.core.signal import Signal
 from pyanaconda.modules.common.base import KickstartService
 from pyanaconda.modules.common.containers import TaskContainer
 
-from org_fedora_hello_world.constants import HELLO_WORLD
+from org_fedora_hello_world.constants import HELLO_WORLD, COMPRESSION_NONE, \
+    COMPRESSION_ZLIB, COMPRESSION_LZMA, COMPRESSION_BLOCK_SIZE, REVERSE_PREVIEW_LINES
+from org_fedora_hello_world.fd_transfer import create_sealed_memfd_from_blocks, read_fd
+from org_fedora_hello_world.service.digest import LineDigest
 from org_fedora_hello_world.service.hello_world_interface import HelloWorldInterface
-from org_fedora_hello_world.service.installation import HelloWorldConfigurationTask, \
-    HelloWorldInstallationTask
-from org_fedora_hello_world.service.kickstart import HelloWorldKickstartSpecification
+from org_fedora_hello_world.service.line_store import LineStore, CompressedLineStore
+from org_fedora_hello_world.service.metrics import metrics, instrument
+from org_fedora_hello_world.service.source import SourceFile
+from org_fedora_hello_world.structures import HelloWorldSummary, HelloWorldConfiguration
 
 log = logging.getLogger(__name__)
 
+# Only the modules required to publish the service are imported above. The
+# kickstart and task modules are imported on the first use, so D-Bus activation
+# doesn't wait for them. The pykickstart parser is still imported up front by
+# KickstartService, see benchmarks/benchmark_startup.py.
+
+
+def get_process_age():
+    """Get the number of seconds since the start of this process.
+
+    :return: a number of seconds
+    """
+    with open("/proc/self/stat") as f:
+        # The process name can contain spaces, so skip it first.
+        fields = f.read().rsplit(")", 1)[1].split()
+
+    # The start time is the 22nd field, the fields start with the 3rd one.
+    start_time = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    return time.clock_gettime(time.CLOCK_BOOTTIME) - start_time
+
+
+def _get_kickstart_size(result, service, data):  # pylint: disable=unused-argument
+    """Get the payload size of the kickstart data in bytes."""
+    addon = data.addons.org_fedora_hello_world
+    return addon.lines.nbytes + sum(lines.nbytes for lines in addon.files.values())
+
 
 class HelloWorld(KickstartService):
     """The HelloWorld D-Bus service.
@@ -41,33 +75,69 @@ class HelloWorld(KickstartService):
     def __init__(self):
         super().__init__()
         self._reverse = False
-        self._lines = []
+        self._lines = LineStore()
+        self._files = {}
+        self._source = None
+        self._compression = (COMPRESSION_NONE, COMPRESSION_BLOCK_SIZE)
+        self._version = 0
+        self._digest = None
+        self._shared_lines = None
 
         self.reverse_changed = Signal()
         self.lines_changed = Signal()
+        self.lines_edited = Signal()
+        self.files_changed = Signal()
+        self.source_changed = Signal()
+        self.summary_changed = Signal()
+
+        self._startup_time = None
 
     def publish(self):
         """Publish the module."""
         TaskContainer.set_namespace(HELLO_WORLD.namespace)
-        DBus.publish_object(HELLO_WORLD.object_path, HelloWorldInterface(self))
+        DBus.publish_object(
+            HELLO_WORLD.object_path,
+            HelloWorldInterface(self),
+            server=GLibServerUnix
+        )
         DBus.register_service(HELLO_WORLD.service_name)
 
+        self._startup_time = get_process_age()
+        log.debug("The service is published %.3f s after the process start.", self._startup_time)
+
+    @property
+    def startup_time(self):
+        """The number of seconds from the process start to the acquired bus name.
+
+        :return: a number of seconds or None if the service is not published
+        """
+        return self._startup_time
+
     @property
     def kickstart_specification(self):
         """Return the kickstart specification."""
+        from org_fedora_hello_world.service.kickstart import HelloWorldKickstartSpecification
         return HelloWorldKickstartSpecification
 
+    @instrument(payload=_get_kickstart_size)
     def process_kickstart(self, data):
         """Process the kickstart data."""
         log.debug("Processing kickstart data...")
         self._reverse = data.addons.org_fedora_hello_world.reverse
-        self._lines = data.addons.org_fedora_hello_world.lines
+        self._lines = self._create_store(data.addons.org_fedora_hello_world.lines)
+        self._files = data.addons.org_fedora_hello_world.files
+        source = data.addons.org_fedora_hello_world.source
+        self._source = SourceFile(source) if source else None
+        self._update_summary()
 
+    @instrument(payload=_get_kickstart_size)
     def setup_kickstart(self, data):
         """Set the given kickstart data."""
         log.debug("Generating kickstart data...")
         data.addons.org_fedora_hello_world.reverse = self._reverse
         data.addons.org_fedora_hello_world.lines = self._lines
+        data.addons.org_fedora_hello_world.files = self._files
+        data.addons.org_fedora_hello_world.source = self.source or None
 
     @property
     def reverse(self):
@@ -77,6 +147,7 @@ class HelloWorld(KickstartService):
     def set_reverse(self, reverse):
         self._reverse = reverse
         self.reverse_changed.emit()
+        self._update_summary(lines_changed=False)
         log.debug("Reverse is set to %s.", reverse)
 
     @property
@@ -84,10 +155,316 @@ class HelloWorld(KickstartService):
         """Lines of the hello world file."""
         return self._lines
 
+    @property
+    def summary(self):
+        """Summary of the hello world data.
+
+        :return: an instance of HelloWorldSummary
+        """
+        summary = HelloWorldSummary()
+        summary.reverse = self._reverse
+        summary.version = self._version
+
+        if self._source is not None:
+            try:
+                count, size, digest, _last = self._source.describe()
+            except OSError as e:
+                log.warning("Failed to read the source %s: %s", self._source.path, e)
+                return summary
+
+            summary.line_count = count
+            summary.size = size
+            summary.digest = digest
+            return summary
+
+        if self._digest is None:
+            self._digest = LineDigest(self._lines.encoded)
+
+        summary.line_count = len(self._lines)
+        summary.size = self._lines.nbytes
+        summary.digest = self._digest.hexdigest()
+        return summary
+
+    def get_configuration(self):
+        """Get the configuration of the hello world file.
+
+        :return: an instance of HelloWorldConfiguration
+        """
+        configuration = HelloWorldConfiguration()
+        configuration.reverse = self._reverse
+        configuration.lines = list(self._lines)
+        configuration.source = self.source
+        return configuration
+
+    def set_configuration(self, configuration):
+        """Set the configuration of the hello world file at once.
+
+        All values are replaced together and the summary is updated
+        only once. The lines are ignored if the source is set.
+
+        :param configuration: an instance of HelloWorldConfiguration
+        :raise: OSError if the source file can't be read
+        """
+        source = SourceFile(configuration.source) if configuration.source else None
+
+        if source is not None:
+            source.describe()
+
+        self._reverse = configuration.reverse
+        self._lines = self._create_store(() if source else configuration.lines)
+        self._source = source
+
+        self.reverse_changed.emit()
+        self.lines_changed.emit()
+        self.source_changed.emit()
+        self._update_summary()
+        log.debug("Configuration is set to %d lines with reverse %s and source %s.",
+                  len(self._lines), self._reverse, self.source)
+
+    def _update_summary(self, lines_changed=True, edit=None):
+        """Update the summary after a change of the data.
+
+        The digest is updated incrementally if the lines were edited
+        in place. Otherwise, it is recalculated on demand.
+
+        :param lines_changed: have the lines changed?
+        :param edit: a tuple with the first edited line and the numbers
+                     of removed and added lines or None
+        """
+        if not lines_changed:
+            pass
+        elif edit is None:
+            self._digest = None
+        elif self._digest is not None:
+            self._digest.update(self._lines, *edit)
+
+        self._version += 1
+        self.summary_changed.emit()
+
+    def get_line_count(self):
+        """Get the number of lines."""
+        return len(self._lines)
+
+    def get_lines(self, start, count, reverse=False):
+        """Get a window of lines.
+
+        The window is clamped to the available lines.
+
+        :param start: an index of the first line of the window
+        :param count: a maximal number of lines in the window
+        :param reverse: should the lines be indexed in the reversed order?
+        :return: a list of lines
+        """
+        start = max(start, 0)
+        count = max(count, 0)
+
+        if not reverse:
+            return self._lines[start:start + count]
+
+        size = len(self._lines)
+        window = self._lines[max(size - start - count, 0):max(size - start, 0)]
+        window.reverse()
+        return window
+
     def set_lines(self, lines):
-        self._lines = lines
+        self._lines = self._create_store(lines)
         self.lines_changed.emit()
-        log.debug("Lines is set to %s.", lines)
+        self._drop_source()
+        self._update_summary()
+        log.debug("Lines is set to %d lines.", len(self._lines))
+
+    def set_lines_from_fd(self, fd):
+        """Set the lines from the encoded text read from a file descriptor.
+
+        The lines_edited signal is emitted instead of the lines_changed
+        signal, so the new lines are not sent back in PropertiesChanged.
+
+        :param fd: a file descriptor owned by this method
+        """
+        data = read_fd(fd)
+
+        try:
+            lines = LineStore.from_encoded(data)
+        finally:
+            if hasattr(data, "close"):
+                data.close()
+
+        removed = len(self._lines)
+        self._lines = self._create_store(lines)
+        self.lines_edited.emit(0, removed, len(lines))
+        self._drop_source()
+        self._update_summary()
+        log.debug("Lines is set to %d lines from a file descriptor.", len(self._lines))
+
+    def import_lines(self, path):
+        """Set the lines from the encoded text of a local file.
+
+        The file is read by the service, so the text doesn't have to
+        be passed over D-Bus. Unlike the source, the file is read only
+        once and it doesn't have to exist during the installation.
+
+        :param path: a path to the file
+        :raise: OSError if the file can't be read
+        """
+        self.set_lines_from_fd(os.open(path, os.O_RDONLY | os.O_CLOEXEC))
+        log.debug("Lines are imported from %s.", path)
+
+    def get_lines_fd(self):
+        """Get a sealed memory file with the encoded text of the lines.
+
+        :return: a file descriptor
+        """
+        return create_sealed_memfd_from_blocks(self._lines.iterate_blocks())
+
+    @property
+    def compression(self):
+        """The compression of the stored lines.
+
+        :return: a tuple with one of the COMPRESSION_* methods and a block size
+        """
+        return self._compression
+
+    def set_compression(self, method, block_size=COMPRESSION_BLOCK_SIZE):
+        """Set the compression of the stored lines.
+
+        The stored lines are converted immediately. The compressed lines
+        are decompressed lazily block by block when they are read.
+
+        :param method: one of the COMPRESSION_* methods
+        :param block_size: a size of uncompressed blocks in bytes
+        :raise: ValueError if the compression is not valid
+        """
+        if method not in (COMPRESSION_NONE, COMPRESSION_ZLIB, COMPRESSION_LZMA):
+            raise ValueError("Invalid compression method: {}".format(method))
+
+        if block_size <= 0:
+            raise ValueError("Invalid block size: {}".format(block_size))
+
+        self._compression = (method, block_size)
+        self._lines = self._create_store(self._lines)
+        log.debug("Compression is set to %s with %d bytes blocks: %s",
+                  method, block_size, self._lines)
+
+    def _create_store(self, lines):
+        """Create a store of the given lines with the configured compression.
+
+        :param lines: an iterable of lines or a line store
+        :return: an instance of LineStore or CompressedLineStore
+        """
+        method, block_size = self._compression
+
+        if method == COMPRESSION_NONE:
+            return lines if isinstance(lines, LineStore) else LineStore(lines)
+
+        if isinstance(lines, CompressedLineStore) \
+                and (lines.method, lines.block_size) == self._compression:
+            return lines
+
+        return CompressedLineStore(lines, method, block_size)
+
+    @property
+    def files(self):
+        """Other files written into the installed system.
+
+        :return: a dictionary of target paths and line stores
+        """
+        return self._files
+
+    def set_files(self, files):
+        """Set other files written into the installed system.
+
+        :param files: a dictionary of target paths and lists of lines
+        :raise: ValueError if a target path is not valid
+        """
+        from org_fedora_hello_world.service.kickstart import get_target_path
+
+        self._files = {
+            get_target_path(path): LineStore(lines) for path, lines in files.items()
+        }
+        self.files_changed.emit()
+        self._update_summary(lines_changed=False)
+        log.debug("Files are set to %s.", list(self._files))
+
+    @property
+    def source(self):
+        """A path to the file with the text of the hello world file.
+
+        The text is read from the file instead of the lines. The file is
+        not loaded into memory, the service holds only a reference to it.
+
+        :return: a path or an empty string
+        """
+        return self._source.path if self._source is not None else ""
+
+    def set_source(self, path):
+        """Set a path to the file with the text of the hello world file.
+
+        The file is read once to check it and describe it in the summary.
+        The lines are cleared, because they are not installed with the source.
+
+        :param path: a path or an empty string to use the lines
+        :raise: OSError if the file can't be read
+        """
+        source = SourceFile(path) if path else None
+
+        if source is not None:
+            source.describe()
+
+        self._source = source
+        self.source_changed.emit()
+
+        if source is None or not len(self._lines):
+            self._update_summary(lines_changed=False)
+        else:
+            self._lines = self._create_store(())
+            self.lines_changed.emit()
+            self._update_summary()
+
+        log.debug("Source is set to %s.", path)
+
+    def _drop_source(self):
+        """Use the lines instead of the source file after they are changed."""
+        if self._source is None:
+            return
+
+        log.debug("The source %s is replaced with lines.", self._source.path)
+        self._source = None
+        self.source_changed.emit()
+
+    def append_lines(self, lines):
+        """Append lines to the end of the hello world file."""
+        self.replace_lines(len(self._lines), 0, lines)
+
+    def insert_lines(self, index, lines):
+        """Insert lines before the given index."""
+        self.replace_lines(index, 0, lines)
+
+    def delete_lines(self, start, count):
+        """Delete a range of lines."""
+        self.replace_lines(start, count, [])
+
+    def replace_lines(self, start, count, lines):
+        """Replace a range of lines in place.
+
+        The range is clamped to the existing lines. Instead of the lines_changed
+        signal, the lines_edited signal is emitted with the first index of the
+        range, the number of removed lines and the number of added lines.
+
+        :param start: an index of the first replaced line
+        :param count: a number of replaced lines
+        :param lines: a list of new lines
+        """
+        start, stop = self._lines.get_range(start, count)
+        size = len(self._lines)
+
+        self._unshare_lines()
+        self._lines.replace(start, stop - start, lines)
+        edit = (start, stop - start, len(self._lines) - size + stop - start)
+
+        self.lines_edited.emit(*edit)
+        self._drop_source()
+        self._update_summary(edit=edit)
+        log.debug("Lines %d-%d are replaced with %d lines.", start, stop, len(lines))
 
     def configure_with_tasks(self):
         """Return configuration tasks.
@@ -97,6 +474,7 @@ class HelloWorld(KickstartService):
         Anaconda's code automatically calls the ***_with_tasks methods and
         stores the returned ***Task instances to later execute their run() methods.
         """
+        from org_fedora_hello_world.service.installation import HelloWorldConfigurationTask
         task = HelloWorldConfigurationTask()
         return [task]
 
@@ -108,8 +486,90 @@ class HelloWorld(KickstartService):
         Anaconda's code automatically calls the ***_with_tasks methods and
         stores the returned ***Task instances to later execute their run() methods.
         """
+        from org_fedora_hello_world.service.installation import HelloWorldInstallationTask
+        # The task runs in another thread and the lines can be edited in place
+        # meanwhile, so the task gets a snapshot of them.
         task = HelloWorldInstallationTask(
             conf.target.system_root,
             self._reverse,
-            self._lines)
+            self._share_lines(),
+            files=self._files,
+            source=self._source)
+        task.stopped_signal.connect(metrics.log_summary)
         return [task]
+
+    @property
+    def metrics(self):
+        """Metrics of the calls of the service.
+
+        :return: a dictionary of names and instances of HelloWorldMetric
+        """
+        return metrics.get_metrics()
+
+    def validate_with_task(self, rules):
+        """Return a task that validates the text of the hello world file.
+
+        :param rules: an instance of HelloWorldValidationRules
+        :return: an instance of HelloWorldValidationTask
+        :raise: ValueError if the rules are not valid
+        """
+        from org_fedora_hello_world.service.installation import HelloWorldValidationTask
+        return HelloWorldValidationTask(self._get_snapshot(), rules)
+
+    def digest_with_task(self, algorithm):
+        """Return a task that computes a digest of the text of the hello world file.
+
+        :param algorithm: a name of the hashlib algorithm
+        :return: an instance of HelloWorldDigestTask
+        :raise: ValueError if the algorithm is not supported
+        """
+        from org_fedora_hello_world.service.installation import HelloWorldDigestTask
+        return HelloWorldDigestTask(self._get_snapshot(), algorithm)
+
+    def statistics_with_task(self):
+        """Return a task that computes statistics of the text of the hello world file.
+
+        :return: an instance of HelloWorldStatisticsTask
+        """
+        from org_fedora_hello_world.service.installation import HelloWorldStatisticsTask
+        return HelloWorldStatisticsTask(self._get_snapshot())
+
+    def reverse_preview_with_task(self, count=REVERSE_PREVIEW_LINES):
+        """Return a task that returns the first lines of the reversed text.
+
+        :param count: a maximal number of lines
+        :return: an instance of HelloWorldReversePreviewTask
+        """
+        from org_fedora_hello_world.service.installation import HelloWorldReversePreviewTask
+        return HelloWorldReversePreviewTask(self._get_snapshot(), count)
+
+    def _get_snapshot(self):
+        """Get a snapshot of the text for a calculation task.
+
+        The source file is only referenced, it isn't modified by the service.
+
+        :return: a snapshot of the line store or the source file
+        """
+        if self._source is not None:
+            return self._source
+
+        return self._share_lines()
+
+    def _share_lines(self):
+        """Share the line store with a task.
+
+        The tasks run in other threads, so the shared store is never edited
+        in place again. It is copied on the next edit instead. The store is
+        not copied if it is replaced or never edited.
+
+        :return: the line store
+        """
+        self._shared_lines = weakref.ref(self._lines)
+        return self._lines
+
+    def _unshare_lines(self):
+        """Copy the line store before it is edited if it is shared with a task."""
+        if self._shared_lines is not None and self._shared_lines() is self._lines:
+            self._lines = self._lines.copy()
+
+        self._shared_lines = None
@@ -17,18 +17,23 @@
 #
 import logging
 
-from dasbus.server.interface import dbus_interface
+from dasbus.server.interface import dbus_interface, dbus_signal
 from dasbus.server.property import emits_properties_changed
 from dasbus.typing import *  # pylint: disable=wildcard-import,unused-wildcard-import
 
 from pyanaconda.modules.common.base import KickstartModuleInterface
+from pyanaconda.modules.common.containers import TaskContainer
 
 from org_fedora_hello_world.constants import HELLO_WORLD
+from org_fedora_hello_world.service.metrics import instrument_interface
+from org_fedora_hello_world.structures import HelloWorldSummary, HelloWorldConfiguration, \
+    HelloWorldValidationRules, HelloWorldMetric
 
 log = logging.getLogger(__name__)
 
 
 @dbus_interface(HELLO_WORLD.interface_name)
+@instrument_interface
 class HelloWorldInterface(KickstartModuleInterface):
     """The interface for HelloWorld.
 
@@ -36,12 +41,19 @@ class HelloWorldInterface(KickstartModuleInterface):
     Anaconda's main process and code running in the D-Bus service process. The
     dasbus library will automatically set up a D-Bus interface based on these
     classes.
+
+    All methods and properties of the interface are measured. The metrics
+    are available in the Metrics property.
     """
 
     def connect_signals(self):
         super().connect_signals()
         self.watch_property("Reverse", self.implementation.reverse_changed)
         self.watch_property("Lines", self.implementation.lines_changed)
+        self.watch_property("Files", self.implementation.files_changed)
+        self.watch_property("Source", self.implementation.source_changed)
+        self.watch_property("Summary", self.implementation.summary_changed)
+        self.implementation.lines_edited.connect(self.LinesEdited)
 
     @property
     def Reverse(self) -> Bool:
@@ -55,8 +67,258 @@ class HelloWorldInterface(KickstartModuleInterface):
     @property
     def Lines(self) -> List[Str]:
         """Lines of the hello world file."""
-        return self.implementation.lines
+        return list(self.implementation.lines)
+
+    @property
+    def Summary(self) -> Structure:
+        """Summary of the hello world data.
+
+        The summary is maintained as the data change, so it is cheap to
+        read it instead of the lines.
+
+        :return: a structure of the type HelloWorldSummary
+        """
+        return HelloWorldSummary.to_structure(self.implementation.summary)
+
+    @property
+    def Metrics(self) -> Dict[Str, Structure]:
+        """Metrics of the calls of the service.
+
+        The metrics are named after the measured methods and properties.
+
+        :return: a dictionary of names and structures of the type HelloWorldMetric
+        """
+        return {
+            name: HelloWorldMetric.to_structure(metric)
+            for name, metric in self.implementation.metrics.items()
+        }
+
+    def GetLineCount(self) -> Int:
+        """Get the number of lines of the hello world file."""
+        return self.implementation.get_line_count()
+
+    def GetLines(self, start: Int, count: Int) -> List[Str]:
+        """Get a window of lines of the hello world file.
+
+        :param start: an index of the first line
+        :param count: a maximal number of lines
+        :return: a list of lines
+        """
+        return self.implementation.get_lines(start, count)
+
+    def GetOutputLines(self, start: Int, count: Int) -> List[Str]:
+        """Get a window of lines in the order they will be written.
+
+        The lines are indexed in the reversed order if Reverse is set.
+
+        :param start: an index of the first line
+        :param count: a maximal number of lines
+        :return: a list of lines
+        """
+        return self.implementation.get_lines(start, count, self.implementation.reverse)
+
+    def GetConfiguration(self) -> Structure:
+        """Get the configuration of the hello world file.
+
+        :return: a structure of the type HelloWorldConfiguration
+        """
+        return HelloWorldConfiguration.to_structure(
+            self.implementation.get_configuration()
+        )
+
+    @emits_properties_changed
+    def SetConfiguration(self, configuration: Structure):
+        """Set the configuration of the hello world file at once.
+
+        The reverse option, the lines and the source are replaced in one
+        call and the changes are announced with one PropertiesChanged signal.
+
+        :param configuration: a structure of the type HelloWorldConfiguration
+        """
+        self.implementation.set_configuration(
+            HelloWorldConfiguration.from_structure(configuration)
+        )
 
     @emits_properties_changed
     def SetLines(self, lines: List[Str]):
         self.implementation.set_lines(lines)
+
+    @emits_properties_changed
+    def SetLinesFromFd(self, fd: UnixFD):
+        """Set lines of the hello world file from a file descriptor.
+
+        The file descriptor should be a sealed memory file or a pipe with
+        the UTF-8 encoded text. The text is split after every line ending
+        without any per-line marshalling. The change is announced with
+        the LinesEdited signal.
+
+        :param fd: a file descriptor
+        """
+        self.implementation.set_lines_from_fd(fd)
+
+    @emits_properties_changed
+    def ImportLines(self, path: Str):
+        """Set lines of the hello world file from a local file.
+
+        The file is read by the service, so the text is not passed over
+        D-Bus. The change is announced with the LinesEdited signal.
+
+        :param path: a path to the file with the UTF-8 encoded text
+        """
+        self.implementation.import_lines(path)
+
+    def GetLinesFd(self) -> UnixFD:
+        """Get lines of the hello world file as a file descriptor.
+
+        :return: a sealed memory file with the UTF-8 encoded text
+        """
+        return self.implementation.get_lines_fd()
+
+    def SetCompression(self, method: Str, block_size: UInt64):
+        """Set the compression of the lines stored in the service.
+
+        The lines can be kept compressed in blocks to save memory of the
+        installation environment. Supported methods are none, zlib and lzma.
+
+        :param method: a name of the compression method
+        :param block_size: a size of uncompressed blocks in bytes
+        """
+        self.implementation.set_compression(method, block_size)
+
+    @property
+    def Files(self) -> Dict[Str, List[Str]]:
+        """Other files written into the installed system.
+
+        :return: a dictionary of absolute target paths and lines
+        """
+        return {
+            "/" + path: list(lines) for path, lines in self.implementation.files.items()
+        }
+
+    @emits_properties_changed
+    def SetFiles(self, files: Dict[Str, List[Str]]):
+        """Set other files written into the installed system.
+
+        :param files: a dictionary of target paths and lines
+        """
+        self.implementation.set_files(files)
+
+    @property
+    def Source(self) -> Str:
+        """A path to the file with the text of the hello world file.
+
+        :return: a path or an empty string if the lines are used
+        """
+        return self.implementation.source
+
+    @emits_properties_changed
+    def SetSource(self, path: Str):
+        """Set a path to the file with the text of the hello world file.
+
+        The file is not loaded into the service, it is streamed into
+        the installed system. The current lines are cleared, because they
+        are not installed with the source. Any change of the lines resets
+        the source.
+
+        :param path: a path or an empty string to use the lines
+        """
+        self.implementation.set_source(path)
+
+    @emits_properties_changed
+    def AppendLines(self, lines: List[Str]):
+        """Append lines to the end of the hello world file.
+
+        :param lines: a list of lines
+        """
+        self.implementation.append_lines(lines)
+
+    @emits_properties_changed
+    def InsertLines(self, index: Int, lines: List[Str]):
+        """Insert lines before the given index.
+
+        :param index: an index of a line
+        :param lines: a list of lines
+        """
+        self.implementation.insert_lines(index, lines)
+
+    @emits_properties_changed
+    def DeleteRange(self, start: Int, count: Int):
+        """Delete a range of lines.
+
+        :param start: an index of the first deleted line
+        :param count: a number of deleted lines
+        """
+        self.implementation.delete_lines(start, count)
+
+    @emits_properties_changed
+    def ReplaceRange(self, start: Int, count: Int, lines: List[Str]):
+        """Replace a range of lines with other lines.
+
+        :param start: an index of the first replaced line
+        :param count: a number of replaced lines
+        :param lines: a list of new lines
+        """
+        self.implementation.replace_lines(start, count, lines)
+
+    def ValidateWithTask(self, rules: Structure) -> ObjPath:
+        """Validate the text of the hello world file with a task.
+
+        The task checks all lines in one pass. Its result is a structure
+        of the type HelloWorldValidationReport.
+
+        :param rules: a structure of the type HelloWorldValidationRules
+        :return: a DBus path of the task
+        """
+        return TaskContainer.to_object_path(
+            self.implementation.validate_with_task(
+                HelloWorldValidationRules.from_structure(rules)
+            )
+        )
+
+    def DigestWithTask(self, algorithm: Str) -> ObjPath:
+        """Compute a digest of the text of the hello world file with a task.
+
+        The result of the task is a hexadecimal string.
+
+        :param algorithm: a name of the digest algorithm, for example sha256
+        :return: a DBus path of the task
+        """
+        return TaskContainer.to_object_path(
+            self.implementation.digest_with_task(algorithm)
+        )
+
+    def StatisticsWithTask(self) -> ObjPath:
+        """Compute statistics of the text of the hello world file with a task.
+
+        The result of the task is a structure of the type HelloWorldStatistics.
+
+        :return: a DBus path of the task
+        """
+        return TaskContainer.to_object_path(
+            self.implementation.statistics_with_task()
+        )
+
+    def ReversePreviewWithTask(self, count: UInt32) -> ObjPath:
+        """Get the first lines of the reversed text with a task.
+
+        The result of the task is a list of strings.
+
+        :param count: a maximal number of lines
+        :return: a DBus path of the task
+        """
+        return TaskContainer.to_object_path(
+            self.implementation.reverse_preview_with_task(count)
+        )
+
+    @dbus_signal
+    def LinesEdited(self, start: Int, removed: Int, added: Int):
+        """Signal that a range of lines has been edited in place.
+
+        The edits don't emit PropertiesChanged with the full Lines value,
+        so the clients have to refresh the affected range themselves.
+
+        :param start: an index of the first edited line
+        :param removed: a number of removed lines
+        :param added: a number of added lines
+        """
+        pass
@@ -33,15 +33,40 @@ The difference between the three kinds is where they come from - configuration
 and installation tasks are returned by specific methods in the service's main
 class, so they are run at pre-defined times.
 
+Calculation tasks are subclasses of CalculationTask. They are returned by the
+***_with_task methods of the service, work with a snapshot of the lines and
+publish their results on D-Bus. Only a bounded number of them runs at once.
+
+The published tasks are kept by the service until it quits, so the tasks
+drop the snapshots of the lines when they finish.
+
 Every kind of task has the run() method that performs the actual work.
 """
 
+import codecs
+import hashlib
+import itertools
 import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from threading import BoundedSemaphore, Lock
 from os.path import normpath, join as joinpath
 
+from dasbus.typing import *  # pylint: disable=wildcard-import,unused-wildcard-import
+
 from pyanaconda.modules.common.task import Task
 
-from org_fedora_hello_world.constants import HELLO_WORLD_FILE_PATH
+from org_fedora_hello_world.constants import HELLO_WORLD_FILE_PATH, WRITE_BUFFER_SIZE, \
+    FSYNC_FILE, PROVISIONING_WORKERS, PROGRESS_REPORT_BYTES, \
+    PROGRESS_REPORT_INTERVAL, ENCODING, VALIDATION_MAX_MESSAGES, CALCULATION_WORKERS, \
+    CALCULATION_CANCEL_CHECK_LINES, CALCULATION_CANCEL_CHECK_INTERVAL
+from org_fedora_hello_world.service.installation_interface import CalculationTaskInterface
+from org_fedora_hello_world.service.metrics import instrument, get_payload_size
+from org_fedora_hello_world.service.writer import FileWriter, get_encoded_size, iterate_lines
+from org_fedora_hello_world.structures import HelloWorldValidationReport, HelloWorldStatistics
 
 log = logging.getLogger(__name__)
 
@@ -56,6 +81,7 @@ class HelloWorldConfigurationTask(Task):
     def name(self):
         return "Configure HelloWorld"
 
+    @instrument
     def run(self):
         """The run method performs the actual work.
 
@@ -64,34 +90,540 @@ class HelloWorldConfigurationTask(Task):
         log.info("Running configuration task.")
 
 
+class ByteProgress:
+    """Rate-limited progress of written bytes.
+
+    The progress is reported after the given number of bytes or after
+    the given time interval since the last report, whichever comes first.
+    It can be updated from multiple threads.
+    """
+
+    def __init__(self, total, callback, report_bytes=PROGRESS_REPORT_BYTES,
+                 report_interval=PROGRESS_REPORT_INTERVAL):
+        """Create a new progress.
+
+        :param total: an expected number of bytes
+        :param callback: a function called with numbers of done and total bytes
+        :param report_bytes: a number of bytes between reports
+        :param report_interval: a number of seconds between reports
+        """
+        self._total = total
+        self._callback = callback
+        self._report_bytes = report_bytes
+        self._report_interval = report_interval
+        self._lock = Lock()
+        self._done = 0
+        self._reported = 0
+        self._reported_time = time.monotonic()
+
+    @property
+    def done(self):
+        """The number of done bytes."""
+        return self._done
+
+    def update(self, size):
+        """Add the given number of done bytes.
+
+        :param size: a number of bytes
+        """
+        with self._lock:
+            self._done += size
+            now = time.monotonic()
+
+            if self._done - self._reported < self._report_bytes \
+                    and now - self._reported_time < self._report_interval:
+                return
+
+            self._reported = self._done
+            self._reported_time = now
+            done = self._done
+
+        self._callback(done, self._total)
+
+
 class HelloWorldInstallationTask(Task):
     """The HelloWorld installation task.
 
-    This task runs at end of installation.
+    This task runs at end of installation. It writes the hello world file
+    and other files into the installed system. The files are written
+    concurrently by a bounded number of workers.
+
+    The text of the hello world file is streamed from the source file
+    if there is any, the lines are ignored in that case.
     """
 
-    def __init__(self, sysroot, reverse, lines):
+    def __init__(self, sysroot, reverse, lines, files=None, source=None,
+                 buffer_size=WRITE_BUFFER_SIZE, fsync_policy=FSYNC_FILE,
+                 skip_unchanged=True, max_workers=PROVISIONING_WORKERS):
         super().__init__()
         self._sysroot = sysroot
         self._reverse = reverse
         self._lines = lines
+        self._files = files or {}
+        self._source = source
+        self._buffer_size = buffer_size
+        self._fsync_policy = fsync_policy
+        self._skip_unchanged = skip_unchanged
+        self._max_workers = max_workers
+
+        self._progress = None
 
     @property
     def name(self):
         return "Install HelloWorld"
 
+    @property
+    def steps(self):
+        """The progress is reported in percents."""
+        return 100
+
+    @property
+    def done_size(self):
+        """The number of written or skipped bytes."""
+        return self._progress.done if self._progress else 0
+
+    @instrument(payload=lambda result, task: task.done_size)
     def run(self):
-        """The run method performs the actual work."""
+        """The run method performs the actual work.
+
+        The lines are dropped when the task finishes.
+        """
+        try:
+            self._install_files()
+        finally:
+            self._lines = None
+            self._files = {}
+            self._source = None
+
+    def _install_files(self):
+        """Write all files into the installed system."""
         log.info("Running installation task.")
-        hello_file_path = normpath(joinpath(self._sysroot, HELLO_WORLD_FILE_PATH))
-        log.debug("Writing hello world file to: %s", hello_file_path)
-
-        # Last line could be missing the trailing line ending if it came from GUI.
-        # That breaks the reversed output, so make sure it is there.
-        if self._lines and not self._lines[-1].endswith("\n"):
-            self._lines[-1] += "\n"
-
-        iterator = reversed(self._lines) if self._reverse else self._lines
-        with open(hello_file_path, "w") as hello_file:
-            for line in iterator:
-                hello_file.write(line)
+        start = time.monotonic()
+
+        main = self._lines if self._source is None else self._source
+        targets = [(HELLO_WORLD_FILE_PATH, main, self._reverse)]
+        targets.extend((path, lines, False) for path, lines in self._files.items())
+
+        total = sum(get_encoded_size(t[1]) or 0 for t in targets)
+        self._progress = ByteProgress(total, self._report_bytes_progress)
+
+        # Create the missing directories before the files are written.
+        for directory in sorted({os.path.dirname(self._get_file_path(t[0])) for t in targets}):
+            os.makedirs(directory, exist_ok=True)
+
+        workers = max(min(self._max_workers, len(targets)), 1)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda t: self._install_file(*t), targets))
+
+        self._report_bytes_progress(self._progress.done, total)
+
+        written = sum(r[0] for r in results)
+        skipped = sum(r[1] for r in results)
+        lines = sum(len(t[1]) for t in targets)
+        elapsed = time.monotonic() - start
+
+        log.info(
+            "Installed %d files with %d lines in %.3f s, written %d bytes (%.2f MB/s), "
+            "skipped %d bytes.", len(targets), lines, elapsed, written,
+            written / elapsed / 1000000 if elapsed else 0.0, skipped
+        )
+
+    def _report_bytes_progress(self, done, total):
+        """Report the progress of written bytes in percents."""
+        percent = min(done * 100 // total, 100) if total else 0
+        self.report_progress(
+            "Writing files ({} of {} bytes)".format(done, total),
+            step_number=percent
+        )
+
+    def _get_file_path(self, path):
+        """Get a path to the file in the system root."""
+        return normpath(joinpath(self._sysroot, path))
+
+    def _install_file(self, path, lines, reverse):
+        """Write one file into the installed system.
+
+        :return: a tuple with numbers of written and skipped bytes
+        """
+        start = time.monotonic()
+        file_path = self._get_file_path(path)
+        log.debug("Writing file to: %s", file_path)
+
+        writer = FileWriter(
+            file_path,
+            buffer_size=self._buffer_size,
+            fsync_policy=self._fsync_policy,
+            progress_callback=self._progress.update
+        )
+
+        written, skipped = self._write_lines(writer, lines, reverse)
+
+        log.info(
+            "Installed %s in %.3f s, written %d bytes, skipped %d bytes.",
+            file_path, time.monotonic() - start, written, skipped
+        )
+
+        return written, skipped
+
+    def _write_lines(self, writer, lines, reverse):
+        """Write the lines unless the target file already contains them.
+
+        Reruns in Initial Setup would rewrite the file with the same content
+        otherwise.
+
+        :return: a tuple with numbers of written and skipped bytes
+        """
+        if self._skip_unchanged and writer.is_unchanged(lines, reverse=reverse):
+            size = os.path.getsize(writer.path)
+            log.debug("The file %s is unchanged, skipping %d bytes.", writer.path, size)
+            self._progress.update(size)
+            return 0, size
+
+        size = writer.write_lines(lines, reverse=reverse)
+        log.debug("Written %d bytes to: %s", size, writer.path)
+        return size, 0
+
+
+class CalculationCanceledError(Exception):
+    """The calculation task has been canceled."""
+
+
+class CalculationTask(Task):
+    """The base class of the HelloWorld calculation tasks.
+
+    A calculation task runs only when the caller starts it. It works with
+    a snapshot of the lines, so the service can be used while the task is
+    running. At most CALCULATION_WORKERS tasks run at once, the other
+    started tasks wait for a free worker.
+
+    The task checks the cancellation regularly and raises
+    CalculationCanceledError if it has been canceled. Subclasses implement
+    the calculate and convert_result methods. The result is converted to
+    a variant at the end of the run, so the task keeps only the variant
+    and drops the snapshot. The runs are measured with the size of the
+    converted result.
+    """
+
+    _workers = BoundedSemaphore(CALCULATION_WORKERS)
+
+    def __init__(self, lines):
+        """Create a new task.
+
+        :param lines: a snapshot of the line store or a source file
+        """
+        super().__init__()
+        self._lines = lines
+
+    def for_publication(self):
+        """Return a DBus representation."""
+        return CalculationTaskInterface(self)
+
+    @instrument(payload=lambda result, task: get_payload_size(result))
+    def run(self):
+        """Wait for a free worker and calculate the result.
+
+        :return: a variant with the result of the calculation
+        :raise: CalculationCanceledError if the task has been canceled
+        """
+        try:
+            while not self._workers.acquire(timeout=CALCULATION_CANCEL_CHECK_INTERVAL):
+                self._check_cancel()
+        except CalculationCanceledError:
+            self._lines = None
+            raise
+
+        try:
+            self._check_cancel()
+            return self.convert_result(self.calculate())
+        finally:
+            self._lines = None
+            self._workers.release()
+
+    def calculate(self):
+        """Calculate the result.
+
+        :return: a result of the calculation
+        """
+        raise NotImplementedError()
+
+    @staticmethod
+    def convert_result(value):
+        """Convert the result to a variant.
+
+        :param value: a result of the calculation
+        :return: a variant
+        """
+        raise NotImplementedError()
+
+    def _check_cancel(self):
+        """Raise an exception if the task has been canceled."""
+        if self.check_cancel():
+            raise CalculationCanceledError("The task {} has been canceled.".format(self.name))
+
+    def _iterate_lines(self):
+        """Iterate over the lines and check the cancellation regularly."""
+        for number, line in enumerate(self._lines, start=1):
+            if not number % CALCULATION_CANCEL_CHECK_LINES:
+                self._check_cancel()
+
+            yield line
+
+    def _iterate_blocks(self):
+        """Iterate over the encoded blocks and check the cancellation."""
+        for block in self._lines.iterate_blocks():
+            self._check_cancel()
+            yield block
+
+
+class HelloWorldDigestTask(CalculationTask):
+    """The HelloWorld digest task.
+
+    This calculation task computes a digest of the text of the hello world
+    file with the given hashlib algorithm. The result is a hexadecimal string.
+    """
+
+    def __init__(self, lines, algorithm):
+        """Create a new task.
+
+        :param lines: a snapshot of the line store or a source file
+        :param algorithm: a name of the hashlib algorithm
+        :raise: ValueError if the algorithm is not available
+        """
+        super().__init__(lines)
+        self._algorithm = algorithm
+
+        try:
+            digest_size = hashlib.new(algorithm).digest_size
+        except ValueError:
+            raise ValueError("Unknown digest algorithm: {}".format(algorithm)) from None
+
+        # The digests of variable length are not supported.
+        if not digest_size:
+            raise ValueError("Unsupported digest algorithm: {}".format(algorithm))
+
+    @property
+    def name(self):
+        return "Compute HelloWorld digest"
+
+    def calculate(self):
+        """Compute the digest.
+
+        :return: a hexadecimal string
+        """
+        digest = hashlib.new(self._algorithm)
+
+        for block in self._iterate_blocks():
+            digest.update(block)
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def convert_result(value):
+        return get_variant(Str, value)
+
+
+class HelloWorldStatisticsTask(CalculationTask):
+    """The HelloWorld statistics task.
+
+    This calculation task counts lines, words and characters of the text
+    of the hello world file. The result is a structure of the type
+    HelloWorldStatistics.
+    """
+
+    @property
+    def name(self):
+        return "Compute HelloWorld statistics"
+
+    def calculate(self):
+        """Compute the statistics.
+
+        :return: an instance of HelloWorldStatistics
+        """
+        statistics = HelloWorldStatistics()
+        statistics.size = get_encoded_size(self._lines) or 0
+
+        for line in self._iterate_lines():
+            if isinstance(line, bytes):
+                line = line.decode(ENCODING, errors="replace")
+
+            text = line[:-1] if line.endswith("\n") else line
+            statistics.line_count += 1
+            statistics.character_count += len(text)
+            statistics.word_count += len(text.split())
+            statistics.max_line_length = max(statistics.max_line_length, len(text))
+
+            if not text.strip():
+                statistics.blank_line_count += 1
+
+        return statistics
+
+    @staticmethod
+    def convert_result(value):
+        return get_variant(Structure, HelloWorldStatistics.to_structure(value))
+
+
+class HelloWorldReversePreviewTask(CalculationTask):
+    """The HelloWorld reverse preview task.
+
+    This calculation task returns the first lines of the reversed text
+    of the hello world file. Only the last lines are read, a source file
+    is read from its end.
+    """
+
+    def __init__(self, lines, count):
+        """Create a new task.
+
+        :param lines: a snapshot of the line store or a source file
+        :param count: a maximal number of returned lines
+        """
+        super().__init__(lines)
+        self._count = count
+
+    @property
+    def name(self):
+        return "Preview reversed HelloWorld"
+
+    def calculate(self):
+        """Get the first lines of the reversed text.
+
+        The lines of a source file are split only after b"\\n" and decoded
+        one by one, so they are the same as the lines of a line store.
+
+        :return: a list of strings
+        """
+        preview = []
+
+        # Close the reversed lines right away, so the source file is unmapped.
+        with closing(iterate_lines(self._lines, reverse=True)) as lines:
+            for number, line in enumerate(itertools.islice(lines, self._count), start=1):
+                if not number % CALCULATION_CANCEL_CHECK_LINES:
+                    self._check_cancel()
+
+                if isinstance(line, bytes):
+                    line = line.decode(ENCODING, errors="replace")
+
+                preview.append(line)
+
+        return preview
+
+    @staticmethod
+    def convert_result(value):
+        return get_variant(List[Str], value)
+
+
+class HelloWorldValidationTask(CalculationTask):
+    """The HelloWorld validation task.
+
+    This calculation task checks all lines in one pass and returns
+    a compact report of the found problems. The result is published
+    as a structure of the type HelloWorldValidationReport.
+    """
+
+    def __init__(self, lines, rules):
+        """Create a new task.
+
+        The rules are checked and the patterns are compiled right away,
+        so invalid rules are reported before the task is started.
+
+        :param lines: a snapshot of the line store or a source file
+        :param rules: an instance of HelloWorldValidationRules
+        :raise: ValueError if the rules are not valid
+        """
+        super().__init__(lines)
+        self._rules = rules
+        self._pattern = None
+
+        if rules.charset:
+            try:
+                codecs.lookup(rules.charset)
+            except LookupError:
+                raise ValueError("Unknown charset: {}".format(rules.charset)) from None
+
+        if rules.patterns:
+            try:
+                self._pattern = re.compile(
+                    "|".join("(?:{})".format(pattern) for pattern in rules.patterns)
+                )
+            except re.error as e:
+                raise ValueError("Invalid pattern: {}".format(e)) from None
+
+    @property
+    def name(self):
+        return "Validate HelloWorld"
+
+    def calculate(self):
+        """Validate the lines.
+
+        :return: an instance of HelloWorldValidationReport
+        """
+        log.info("Running validation task.")
+        report = HelloWorldValidationReport()
+        report.size = get_encoded_size(self._lines) or 0
+
+        # Don't check the lines if the text is too large.
+        if self._rules.max_size and report.size > self._rules.max_size:
+            report.line_count = len(self._lines)
+            self._add_problem(report, "The text has {} bytes, the limit is {} bytes.".format(
+                report.size, self._rules.max_size
+            ))
+            return report
+
+        for number, line in enumerate(self._iterate_lines(), start=1):
+            report.line_count = number
+            problem = self._check_line(report, line)
+
+            if problem:
+                report.invalid_line_count += 1
+                self._add_problem(report, "Line {}: {}".format(number, problem))
+
+        log.info(
+            "Validated %d lines, found %d invalid lines.",
+            report.line_count, report.invalid_line_count
+        )
+        return report
+
+    def _check_line(self, report, line):
+        """Check one line.
+
+        :return: a description of the problem or None
+        """
+        if isinstance(line, bytes):
+            try:
+                line = line.decode(ENCODING)
+            except UnicodeDecodeError:
+                return "The line is not valid {}.".format(ENCODING)
+
+        text = line[:-1] if line.endswith("\n") else line
+        report.max_line_length = max(report.max_line_length, len(text))
+
+        if self._rules.max_line_length and len(text) > self._rules.max_line_length:
+            return "The line has {} characters, the limit is {} characters.".format(
+                len(text), self._rules.max_line_length
+            )
+
+        if self._rules.charset:
+            try:
+                text.encode(self._rules.charset)
+            except UnicodeEncodeError:
+                return "The line can't be encoded in {}.".format(self._rules.charset)
+
+        if self._pattern and not self._pattern.fullmatch(text):
+            return "The line doesn't match any of the allowed patterns."
+
+        return None
+
+    @staticmethod
+    def convert_result(value):
+        return get_variant(Structure, HelloWorldValidationReport.to_structure(value))
+
+    @staticmethod
+    def _add_problem(report, message):
+        """Add a problem to the report.
+
+        Only the first messages are kept, so the report stays compact.
+        """
+        report.valid = False
+
+        if len(report.messages) < VALIDATION_MAX_MESSAGES:
+            report.messages.append(message)
@@ -0,0 +1,39 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module contains D-Bus interfaces of the calculation tasks."""
+
+from pyanaconda.modules.common.task import TaskInterface
+
+__all__ = ["CalculationTaskInterface"]
+
+
+class CalculationTaskInterface(TaskInterface):
+    """The interface of a HelloWorld calculation task.
+
+    The result of the task is converted by the task itself at the end
+    of its run, so one interface serves all calculation tasks.
+    """
+
+    def convert_result(self, value):  # pylint: disable=arguments-differ
+        """Return the converted result of the task.
+
+        :param value: a variant with the result of the task
+        :return: the same variant
+        """
+        return value
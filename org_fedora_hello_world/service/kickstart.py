@@ -18,23 +18,96 @@
 
 """This module defines the parts needed for handling Kickstart data in the service."""
 
+import functools
 import logging
+import os
+import shlex
 
+from pykickstart.errors import KickstartParseError
 from pykickstart.options import KSOptionParser
 
 from pyanaconda.core.kickstart import VERSION, KickstartSpecification
 from pyanaconda.core.kickstart.addon import AddonData
 
+from org_fedora_hello_world.constants import KICKSTART_CHUNK_SIZE, KICKSTART_BATCH_LINES, \
+    HELLO_WORLD_FILE_PATH
+from org_fedora_hello_world.service.line_store import LineStore
+
 log = logging.getLogger(__name__)
 
 
+def get_target_path(path):
+    """Get a normalized path of a target file in the installed system.
+
+    The path is relative to the system root and it can't point outside
+    of it or to the hello world file.
+
+    :param path: an absolute or relative path
+    :return: a normalized relative path
+    :raise: ValueError if the path is not valid
+    """
+    target = os.path.normpath("/" + path).lstrip("/")
+
+    if not target or target == HELLO_WORLD_FILE_PATH:
+        raise ValueError("Invalid target path: {}".format(path))
+
+    return target
+
+
+@functools.lru_cache(maxsize=None)
+def get_header_parser():
+    """Get the parser of arguments in the %addon section line.
+
+    The parser is created only once and reused for every section.
+
+    :return: an instance of KSOptionParser
+    """
+    # Create the argument parser.
+    op = KSOptionParser(
+        prog="%addon org_fedora_hello_world",
+        version=VERSION,
+        description="Configure the Hello World Addon."
+    )
+
+    op.add_argument(
+        "--reverse",
+        action="store_true",
+        default=False,
+        version=VERSION,
+        dest="reverse",
+        help="Reverse the display of the addon text."
+    )
+
+    op.add_argument(
+        "--target",
+        default=None,
+        version=VERSION,
+        dest="target",
+        help="Write the addon text to the given path instead."
+    )
+
+    op.add_argument(
+        "--source",
+        default=None,
+        version=VERSION,
+        dest="source",
+        help="Read the addon text from the given file instead."
+    )
+
+    return op
+
+
 class HelloWorldData(AddonData):
     """The kickstart data for the Hello World addon."""
 
     def __init__(self):
         super().__init__()
-        self.lines = []
+        self.lines = LineStore()
         self.reverse = False
+        self.files = {}
+        self.source = None
+        self._current_lines = self.lines
+        self._pending_lines = []
 
     def handle_header(self, args, line_number=None):
         """The handle_header method is called to parse additional arguments
@@ -47,32 +120,47 @@ class HelloWorldData(AddonData):
 
         handle_header will be called with args=['--reverse', '--arg2="example"']
 
+        The section can be repeated with the --target option. Lines of such
+        a section are written to the given path in the installed system:
+
+            %addon org_fedora_hello_world --target=/etc/hello.conf
+
+        The text of the main section can be read from a file in the
+        installation environment with the --source option. Such a section
+        can't contain any lines:
+
+            %addon org_fedora_hello_world --source=/run/install/hello.txt
+
         :param line_number: the current line number in the kickstart file
         :type line_number: int
         :param args: the list of arguments from the %addon line
         :type args: List[Str]
         """
-        # Create the argument parser.
-        op = KSOptionParser(
-            prog="%addon org_fedora_hello_world",
-            version=VERSION,
-            description="Configure the Hello World Addon."
-        )
-
-        op.add_argument(
-            "--reverse",
-            action="store_true",
-            default=False,
-            version=VERSION,
-            dest="reverse",
-            help="Reverse the display of the addon text."
-        )
+        # Store the lines of the previous section.
+        self._store_pending_lines()
 
-        # Parse the arguments.
-        ns = op.parse_args(args=args, lineno=line_number)
+        # Parse the arguments with the shared parser.
+        ns = get_header_parser().parse_args(args=args, lineno=line_number)
 
         # Store the result of the parsing.
-        self.reverse = ns.reverse
+        if not ns.target:
+            self.reverse = ns.reverse
+            self.source = ns.source
+            self._current_lines = None if ns.source else self.lines
+            return
+
+        if ns.reverse or ns.source:
+            raise KickstartParseError(
+                "The --reverse and --source options can't be used with --target.",
+                lineno=line_number
+            )
+
+        try:
+            target = get_target_path(ns.target)
+        except ValueError as e:
+            raise KickstartParseError(str(e), lineno=line_number) from None
+
+        self._current_lines = self.files.setdefault(target, LineStore())
 
     def handle_line(self, line, line_number=None):  # pylint: disable=unused-argument
         """The handle_line method that is called with every line from this
@@ -88,33 +176,135 @@ class HelloWorldData(AddonData):
         ...will result in two calls to handle_line, once with "Hello world!"
         and another time with "foo bar baz".
 
+        The lines are buffered and stored in batches. The last batch is
+        stored at the end of the section.
+
         :param line: a single line from the %addon section
         :type line: str
         :param line_number: number of the line
         :type line_number: int
         """
-        # simple example, we just append lines to the lines attribute
-        self.lines.append(line)
+        if self._current_lines is None:
+            self._check_source_line(line, line_number)
+            return
 
-    def __str__(self):
-        """What should end up in the resulting kickstart file, i.e. the %addon
-        section containing string representation of the stored data.
+        self._pending_lines.append(line)
+
+        if len(self._pending_lines) >= KICKSTART_BATCH_LINES:
+            self._store_pending_lines()
+
+    def handle_lines(self, lines, line_number=None):  # pylint: disable=unused-argument
+        """Handle all lines of the %addon section at once.
+
+        This is a batch variant of handle_line. The lines are appended to
+        the line store in one call instead of one call per line.
+
+        :param lines: an iterable of lines from the %addon section
+        :type lines: Iterable[str]
+        :param line_number: number of the first line
+        :type line_number: int
+        """
+        if self._current_lines is not None:
+            self._current_lines.extend(lines)
+            return
+
+        for line in lines:
+            self._check_source_line(line, line_number)
+
+    def handle_end(self):
+        """The handle_end method is called at the end of the %addon section.
+
+        The buffered lines of the section are stored.
+        """
+        self._store_pending_lines()
+
+    def _store_pending_lines(self):
+        """Store the buffered lines of the current section."""
+        if self._pending_lines:
+            self.handle_lines(self._pending_lines)
+            self._pending_lines = []
+
+    @staticmethod
+    def _check_source_line(line, line_number):
+        """Check a line of the section with the --source option.
+
+        Blank lines of the section are discarded, other lines are not allowed.
+        """
+        if line.strip():
+            raise KickstartParseError(
+                "The section with the --source option can't contain lines.",
+                lineno=line_number
+            )
+
+    def iterate_chunks(self, chunk_size=KICKSTART_CHUNK_SIZE):
+        """Generate the %addon sections in chunks.
+
+        The lines are joined into chunks of roughly the given size, so the
+        sections can be generated in linear time and streamed without keeping
+        the whole string in memory.
+
+        :param chunk_size: a size of chunks in characters
+        :return: an iterator of strings
         """
-        section = "\n%addon org_fedora_hello_world"
+        options = " --reverse" if self.reverse else ""
+
+        if self.source:
+            options += " --source=" + shlex.quote(self.source)
+
+        yield from self._iterate_section_chunks(
+            options,
+            () if self.source else self.lines,
+            chunk_size
+        )
+
+        for target, lines in self.files.items():
+            yield from self._iterate_section_chunks(
+                " --target=" + shlex.quote("/" + target),
+                lines,
+                chunk_size
+            )
+
+    @staticmethod
+    def _iterate_section_chunks(options, lines, chunk_size):
+        """Generate one %addon section in chunks."""
+        header = "\n%addon org_fedora_hello_world" + options
+
+        chunk = [header + "\n"]
+        size = len(chunk[0])
+        last_line = chunk[0]
+
+        for line in lines:
+            if not line:
+                continue
 
-        if self.reverse:
-            section += " --reverse"
+            chunk.append(line)
+            size += len(line)
+            last_line = line
 
-        section += "\n"
+            if size >= chunk_size:
+                yield "".join(chunk)
+                chunk = []
+                size = 0
 
-        for line in self.lines:
-            section += line
+        if not last_line.endswith("\n"):
+            chunk.append("\n")
 
-        if not section.endswith("\n"):
-            section += "\n"
+        chunk.append("%end\n")
+        yield "".join(chunk)
 
-        section += "%end\n"
-        return section
+    def write_to(self, fp):
+        """Write the %addon section into the given file object.
+
+        :param fp: a file object opened for writing text
+        """
+        for chunk in self.iterate_chunks():
+            fp.write(chunk)
+
+    def __str__(self):
+        """What should end up in the resulting kickstart file, i.e. the %addon
+        section containing string representation of the stored data.
+        """
+        return "".join(self.iterate_chunks())
 
 
 class HelloWorldKickstartSpecification(KickstartSpecification):
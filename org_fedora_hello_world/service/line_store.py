@@ -0,0 +1,734 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module contains the compact storage of lines used by the service."""
+
+import codecs
+import lzma
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+
+from org_fedora_hello_world.constants import ENCODING, COMPRESSION_ZLIB, COMPRESSION_LZMA, \
+    COMPRESSION_BLOCK_SIZE
+
+__all__ = ["BaseLineStore", "LineStore", "CompressedLineStore"]
+
+# The size of chunks of encoded data that are validated at once.
+VALIDATION_CHUNK_SIZE = 1024 * 1024
+
+# The maximal size of blocks of encoded data returned by iterate_blocks.
+ITERATION_BLOCK_SIZE = 1024 * 1024
+
+# The functions that compress and decompress blocks of lines.
+COMPRESSORS = {
+    COMPRESSION_ZLIB: (zlib.compress, zlib.decompress),
+    COMPRESSION_LZMA: (lzma.compress, lzma.decompress),
+}
+
+
+class BaseLineStore:
+    """The base class of stores of lines.
+
+    The subclasses provide access to the encoded lines and the replace
+    method. The rest of the sequence interface is implemented here.
+    """
+
+    @property
+    def nbytes(self):
+        """The size of the encoded lines in bytes."""
+        raise NotImplementedError()
+
+    @property
+    def encoded(self):
+        """The sequence of the encoded lines."""
+        raise NotImplementedError()
+
+    def iterate_blocks(self, offset=0):
+        """Iterate over blocks of the encoded lines.
+
+        The blocks are copies of the data, so the store can be changed
+        after they are returned.
+
+        :param offset: an offset of the first byte
+        :return: an iterator of bytes
+        """
+        raise NotImplementedError()
+
+    def copy(self):
+        """Create a copy of the store.
+
+        The copy is not affected by later changes of the store.
+
+        :return: a new store of the same type
+        """
+        raise NotImplementedError()
+
+    def append(self, line):
+        """Append a line to the end of the store.
+
+        :param line: a string
+        """
+        self.extend([line])
+
+    def extend(self, lines):
+        """Append lines to the end of the store.
+
+        :param lines: an iterable of strings
+        """
+        self.replace(len(self), 0, lines)
+
+    def insert(self, index, lines):
+        """Insert lines before the given index.
+
+        :param index: an index of a line
+        :param lines: an iterable of strings
+        """
+        self.replace(index, 0, lines)
+
+    def delete(self, start, count):
+        """Delete a range of lines.
+
+        :param start: an index of the first deleted line
+        :param count: a number of deleted lines
+        """
+        self.replace(start, count, ())
+
+    def replace(self, start, count, lines):
+        """Replace a range of lines with other lines.
+
+        The range is clamped to the existing lines the same way as
+        the slice assignment of a list clamps it.
+
+        :param start: an index of the first replaced line
+        :param count: a number of replaced lines
+        :param lines: an iterable of strings
+        """
+        raise NotImplementedError()
+
+    def get_range(self, start, count):
+        """Clamp the given range to the existing lines.
+
+        :param start: an index of the first line
+        :param count: a number of lines
+        :return: a tuple with the first index and the index after the last line
+        """
+        size = len(self)
+        start = min(max(start, 0), size)
+        stop = min(start + max(count, 0), size)
+        return start, stop
+
+    def get_encoded(self, index):
+        """Get the encoded line at the given index.
+
+        :param index: an index of the line
+        :return: bytes
+        """
+        raise NotImplementedError()
+
+    def _get_index(self, index):
+        """Check and normalize the given index."""
+        size = len(self)
+
+        if index < 0:
+            index += size
+
+        if not 0 <= index < size:
+            raise IndexError("Line index out of range.")
+
+        return index
+
+    def __len__(self):
+        raise NotImplementedError()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        return self.get_encoded(index).decode(ENCODING)
+
+    def __iter__(self):
+        for line in self.encoded:
+            yield line.decode(ENCODING)
+
+    def __reversed__(self):
+        for line in reversed(self.encoded):
+            yield line.decode(ENCODING)
+
+    def __repr__(self):
+        return "{}({} lines, {} bytes)".format(type(self).__name__, len(self), self.nbytes)
+
+
+class LineStore(BaseLineStore):
+    """A compact store of lines.
+
+    All lines are kept encoded in a single byte buffer. An array of offsets
+    marks the boundaries of the lines, so there is no per-line object
+    overhead. The lines are decoded only when they are accessed.
+
+    The store behaves like a sequence of strings. It supports len, indexing,
+    slicing, iteration and reversed iteration. Slices are returned as lists.
+    """
+
+    def __init__(self, lines=()):
+        """Create a new store.
+
+        :param lines: an iterable of lines
+        """
+        self._data = bytearray()
+        self._offsets = array("Q", [0])
+        self.extend(lines)
+
+    @classmethod
+    def from_encoded(cls, data, validate=True):
+        """Create a new store from the encoded text.
+
+        The text is split into lines after every line ending. The lines
+        are not decoded, the data are only checked to be valid.
+
+        :param data: a bytes-like object
+        :param validate: should the data be checked?
+        :return: a new line store
+        :raise: UnicodeDecodeError if the data are not valid
+        """
+        if validate:
+            _check_encoding(data)
+
+        store = cls()
+        store._data[:] = data
+        buffer = store._data
+        offsets = store._offsets
+        position = 0
+
+        while True:
+            position = buffer.find(b"\n", position) + 1
+
+            if not position:
+                break
+
+            offsets.append(position)
+
+        if offsets[-1] != len(buffer):
+            offsets.append(len(buffer))
+
+        return store
+
+    @property
+    def nbytes(self):
+        """The size of the encoded lines in bytes."""
+        return len(self._data)
+
+    @property
+    def encoded(self):
+        """The sequence of the encoded lines."""
+        return _EncodedLines(self)
+
+    def iterate_blocks(self, offset=0):
+        """Iterate over blocks of the encoded lines.
+
+        The blocks are copies of the data, so the store can be changed
+        after they are returned.
+
+        :param offset: an offset of the first byte
+        :return: an iterator of bytes
+        """
+        for start in range(offset, len(self._data), ITERATION_BLOCK_SIZE):
+            yield bytes(self._data[start:start + ITERATION_BLOCK_SIZE])
+
+    def copy(self):
+        """Create a copy of the store.
+
+        :return: a new line store
+        """
+        store = LineStore()
+        store._extend_store(self)
+        return store
+
+    @contextmanager
+    def view(self):
+        """Provide a read-only memory view of the encoded lines.
+
+        The store can't be resized while the view is in use.
+        """
+        with memoryview(self._data) as view, view.toreadonly() as readonly:
+            yield readonly
+
+    def append(self, line):
+        """Append a line to the end of the store.
+
+        :param line: a string
+        """
+        self._data += line.encode(ENCODING)
+        self._offsets.append(len(self._data))
+
+    def extend(self, lines):
+        """Append lines to the end of the store.
+
+        :param lines: an iterable of strings or a line store
+        """
+        if isinstance(lines, LineStore):
+            self._extend_store(lines)
+            return
+
+        data = self._data
+        offsets = self._offsets
+
+        for line in lines:
+            data += line.encode(ENCODING)
+            offsets.append(len(data))
+
+    def _extend_store(self, store):
+        """Append the encoded lines of another store."""
+        # pylint: disable=protected-access
+        size = len(self._data)
+        self._data += store._data
+        self._offsets.extend(offset + size for offset in store._offsets[1:])
+
+    def replace(self, start, count, lines):
+        """Replace a range of lines with other lines.
+
+        The range is clamped to the existing lines the same way as
+        the slice assignment of a list clamps it.
+
+        :param start: an index of the first replaced line
+        :param count: a number of replaced lines
+        :param lines: an iterable of strings
+        """
+        start, stop = self.get_range(start, count)
+        replacement = LineStore(lines)
+
+        begin = self._offsets[start]
+        end = self._offsets[stop]
+        delta = replacement.nbytes - (end - begin)
+
+        tail = self._offsets[stop + 1:]
+
+        if delta:
+            tail = array("Q", (offset + delta for offset in tail))
+
+        # pylint: disable=protected-access
+        head = array("Q", (offset + begin for offset in replacement._offsets[1:]))
+
+        self._data[begin:end] = replacement._data
+        self._offsets[start + 1:] = head + tail
+
+    def get_encoded(self, index):
+        """Get the encoded line at the given index.
+
+        :param index: an index of the line
+        :return: bytes
+        """
+        index = self._get_index(index)
+        return bytes(self._data[self._offsets[index]:self._offsets[index + 1]])
+
+    def _get_slice(self, start, stop):
+        """Get a new store with the lines in the given range."""
+        # pylint: disable=protected-access
+        store = LineStore()
+        begin = self._offsets[start]
+        store._data[:] = self._data[begin:self._offsets[stop]]
+        store._offsets = array("Q", (offset - begin for offset in self._offsets[start:stop + 1]))
+        return store
+
+    def _to_bytes(self):
+        """Serialize the store into bytes."""
+        return self._offsets.tobytes() + self._data
+
+    @classmethod
+    def _from_bytes(cls, data, count):
+        """Deserialize a store with the given number of lines."""
+        # pylint: disable=protected-access
+        store = cls()
+
+        with memoryview(data) as view:
+            size = (count + 1) * store._offsets.itemsize
+            store._offsets = array("Q")
+            store._offsets.frombytes(view[:size])
+            store._data[:] = view[size:]
+
+        return store
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        index = self._get_index(index)
+        return self._data[self._offsets[index]:self._offsets[index + 1]].decode(ENCODING)
+
+    def __eq__(self, other):
+        if isinstance(other, LineStore):
+            return self._data == other._data and self._offsets == other._offsets
+
+        return NotImplemented
+
+
+class CompressedLineStore(BaseLineStore):
+    """A compressed store of lines.
+
+    The lines are kept in blocks of roughly the given size. Every block is
+    a serialized line store compressed with zlib or lzma. An index of the
+    numbers of lines and bytes before every block gives random access to
+    the blocks, so only the accessed blocks are decompressed. The lines
+    appended to the end are kept uncompressed until they fill a block.
+
+    The store behaves like a line store, but it doesn't provide a memory
+    view of all lines.
+    """
+
+    def __init__(self, lines=(), method=COMPRESSION_ZLIB, block_size=COMPRESSION_BLOCK_SIZE):
+        """Create a new store.
+
+        :param lines: an iterable of lines or a line store
+        :param method: one of the COMPRESSION_* methods except none
+        :param block_size: a size of uncompressed blocks in bytes
+        """
+        if method not in COMPRESSORS:
+            raise ValueError("Invalid compression method: {}".format(method))
+
+        if block_size <= 0:
+            raise ValueError("Invalid block size: {}".format(block_size))
+
+        self._method = method
+        self._block_size = block_size
+        self._compress, self._decompress = COMPRESSORS[method]
+        self._blocks = []
+        self._line_index = array("Q", [0])
+        self._byte_index = array("Q", [0])
+        self._tail = LineStore()
+        self._cache = None
+        self.extend(lines)
+
+    @classmethod
+    def from_encoded(cls, data, method=COMPRESSION_ZLIB, block_size=COMPRESSION_BLOCK_SIZE):
+        """Create a new store from the encoded text.
+
+        :param data: a bytes-like object
+        :param method: one of the COMPRESSION_* methods except none
+        :param block_size: a size of uncompressed blocks in bytes
+        :return: a new compressed line store
+        :raise: UnicodeDecodeError if the data are not valid
+        """
+        return cls(LineStore.from_encoded(data), method, block_size)
+
+    @property
+    def method(self):
+        """The compression method."""
+        return self._method
+
+    @property
+    def block_size(self):
+        """The size of uncompressed blocks in bytes."""
+        return self._block_size
+
+    @property
+    def nbytes(self):
+        """The size of the encoded lines in bytes."""
+        return self._byte_index[-1] + self._tail.nbytes
+
+    @property
+    def compressed_nbytes(self):
+        """The size of the compressed blocks and the uncompressed tail in bytes."""
+        return sum(map(len, self._blocks)) + self._tail.nbytes
+
+    @property
+    def encoded(self):
+        """The sequence of the encoded lines."""
+        return _CompressedEncodedLines(self)
+
+    def iterate_blocks(self, offset=0):
+        """Iterate over blocks of the encoded lines.
+
+        Every compressed block is decompressed only once.
+
+        :param offset: an offset of the first byte
+        :return: an iterator of bytes
+        """
+        for index, block in enumerate(self._blocks):
+            begin = self._byte_index[index]
+
+            if self._byte_index[index + 1] <= offset:
+                continue
+
+            count = self._line_index[index + 1] - self._line_index[index]
+            header = (count + 1) * self._line_index.itemsize
+
+            with memoryview(self._decompress(block)) as view:
+                yield bytes(view[header + max(offset - begin, 0):])
+
+        yield from self._tail.iterate_blocks(max(offset - self._byte_index[-1], 0))
+
+    def copy(self):
+        """Create a copy of the store.
+
+        The compressed blocks are immutable, so they are shared with
+        the copy. Only the index and the uncompressed tail are copied.
+
+        :return: a new compressed line store
+        """
+        store = CompressedLineStore(method=self._method, block_size=self._block_size)
+        # pylint: disable=protected-access
+        store._blocks = list(self._blocks)
+        store._line_index = array("Q", self._line_index)
+        store._byte_index = array("Q", self._byte_index)
+        store._tail = self._tail.copy()
+        return store
+
+    def extend(self, lines):
+        """Append lines to the end of the store.
+
+        :param lines: an iterable of strings or a line store
+        """
+        if isinstance(lines, LineStore):
+            self._tail.extend(lines)
+            self._compress_tail()
+            return
+
+        for line in lines:
+            self._tail.append(line)
+
+            if self._tail.nbytes >= self._block_size:
+                self._compress_tail()
+
+    def replace(self, start, count, lines):
+        """Replace a range of lines with other lines.
+
+        Only the blocks with the replaced lines are decompressed and
+        compressed again.
+
+        :param start: an index of the first replaced line
+        :param count: a number of replaced lines
+        :param lines: an iterable of strings
+        """
+        start, stop = self.get_range(start, count)
+        first, first_line = self._locate(start)
+        last, _ = self._locate(max(stop - 1, start))
+
+        # Collect the affected blocks into one line store.
+        region = LineStore()
+
+        for index in range(first, last + 1):
+            region.extend(self._get_block(index))
+
+        region.replace(first_line, stop - start, lines)
+        self._cache = None
+
+        if last == len(self._blocks):
+            # The region contains the tail, so the new tail is taken from it.
+            self._splice_blocks(first, len(self._blocks), ())
+            self._tail = region
+            self._compress_tail()
+            return
+
+        self._splice_blocks(first, last + 1, self._compress_ranges(region, self._get_ranges(region)))
+
+    def get_encoded(self, index):
+        """Get the encoded line at the given index.
+
+        :param index: an index of the line
+        :return: bytes
+        """
+        block, line = self._locate(self._get_index(index))
+        return self._get_block(block).get_encoded(line)
+
+    def iterate_encoded(self, reverse=False):
+        """Iterate over the encoded lines block by block.
+
+        :param reverse: should the lines be iterated in the reversed order?
+        :return: an iterator of bytes
+        """
+        indexes = range(len(self._blocks) + 1)
+
+        if reverse:
+            for index in reversed(indexes):
+                yield from reversed(self._get_block(index, cache=False).encoded)
+        else:
+            for index in indexes:
+                yield from self._get_block(index, cache=False).encoded
+
+    def _locate(self, index):
+        """Get the block of the line at the given index.
+
+        :return: a tuple with the block index and the line index in the block
+        """
+        block = bisect_right(self._line_index, index) - 1
+        return block, index - self._line_index[block]
+
+    def _get_block(self, index, cache=True):
+        """Get the decompressed block at the given index.
+
+        The tail is returned as the last block. The last decompressed
+        block is cached for repeated access. The store can be read from
+        multiple threads, so the cache is read only once.
+
+        :return: a line store
+        """
+        if index == len(self._blocks):
+            return self._tail
+
+        cached = self._cache
+
+        if cached and cached[0] == index:
+            return cached[1]
+
+        count = self._line_index[index + 1] - self._line_index[index]
+        # pylint: disable=protected-access
+        block = LineStore._from_bytes(self._decompress(self._blocks[index]), count)
+
+        if cache:
+            self._cache = (index, block)
+
+        return block
+
+    def _get_ranges(self, store):
+        """Split the line store into ranges of lines of roughly the block size.
+
+        :return: an iterator of tuples with the first and the last but one index
+        """
+        # pylint: disable=protected-access
+        offsets = store._offsets
+        size = len(store)
+        start = 0
+
+        while start < size:
+            stop = min(bisect_left(offsets, offsets[start] + self._block_size, start + 1), size)
+            yield start, stop
+            start = stop
+
+    def _compress_ranges(self, store, ranges):
+        """Compress the ranges of lines of the line store.
+
+        :return: a list of tuples with a block, a number of lines and a number of bytes
+        """
+        blocks = []
+
+        for start, stop in ranges:
+            # pylint: disable=protected-access
+            block = store._get_slice(start, stop)
+            blocks.append((self._compress(block._to_bytes()), len(block), block.nbytes))
+
+        return blocks
+
+    def _compress_tail(self):
+        """Compress the full blocks of the tail."""
+        # pylint: disable=protected-access
+        tail = self._tail
+        ranges = list(self._get_ranges(tail))
+        start = len(tail)
+
+        # Keep the last partial block uncompressed.
+        if ranges and tail.nbytes - tail._offsets[ranges[-1][0]] < self._block_size:
+            start = ranges.pop()[0]
+
+        self._splice_blocks(len(self._blocks), len(self._blocks), self._compress_ranges(tail, ranges))
+        self._tail = tail._get_slice(start, len(tail))
+
+    def _splice_blocks(self, start, stop, blocks):
+        """Replace the compressed blocks in the given range and update the index."""
+        if start == stop == len(self._blocks):
+            # Only append the new blocks.
+            for block, lines, size in blocks:
+                self._blocks.append(block)
+                self._line_index.append(self._line_index[-1] + lines)
+                self._byte_index.append(self._byte_index[-1] + size)
+
+            return
+
+        line_counts = [b - a for a, b in zip(self._line_index, self._line_index[1:])]
+        byte_counts = [b - a for a, b in zip(self._byte_index, self._byte_index[1:])]
+
+        self._blocks[start:stop] = [block[0] for block in blocks]
+        line_counts[start:stop] = [block[1] for block in blocks]
+        byte_counts[start:stop] = [block[2] for block in blocks]
+
+        self._line_index = array("Q", [0])
+        self._byte_index = array("Q", [0])
+
+        for lines, size in zip(line_counts, byte_counts):
+            self._line_index.append(self._line_index[-1] + lines)
+            self._byte_index.append(self._byte_index[-1] + size)
+
+    def __len__(self):
+        return self._line_index[-1] + len(self._tail)
+
+    def __repr__(self):
+        return "{}({} lines, {} bytes, {} compressed bytes)".format(
+            type(self).__name__, len(self), self.nbytes, self.compressed_nbytes
+        )
+
+
+def _check_encoding(data):
+    """Check that the data are correctly encoded."""
+    decoder = codecs.getincrementaldecoder(ENCODING)()
+
+    with memoryview(data) as view:
+        for start in range(0, len(view), VALIDATION_CHUNK_SIZE):
+            decoder.decode(view[start:start + VALIDATION_CHUNK_SIZE])
+
+    decoder.decode(b"", final=True)
+
+
+class _EncodedLines:
+    """The sequence of encoded lines of a line store."""
+
+    def __init__(self, store):
+        self._store = store
+
+    def __len__(self):
+        return len(self._store)
+
+    def __getitem__(self, index):
+        return self._store.get_encoded(index)
+
+    def __iter__(self):
+        # pylint: disable=protected-access
+        data = self._store._data
+        offsets = self._store._offsets
+
+        for i in range(len(offsets) - 1):
+            yield bytes(data[offsets[i]:offsets[i + 1]])
+
+    def __reversed__(self):
+        # pylint: disable=protected-access
+        data = self._store._data
+        offsets = self._store._offsets
+
+        for i in range(len(offsets) - 2, -1, -1):
+            yield bytes(data[offsets[i]:offsets[i + 1]])
+
+
+class _CompressedEncodedLines:
+    """The sequence of encoded lines of a compressed line store."""
+
+    def __init__(self, store):
+        self._store = store
+
+    def __len__(self):
+        return len(self._store)
+
+    def __getitem__(self, index):
+        return self._store.get_encoded(index)
+
+    def __iter__(self):
+        return self._store.iterate_encoded()
+
+    def __reversed__(self):
+        return self._store.iterate_encoded(reverse=True)
@@ -0,0 +1,235 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module contains metrics of the service.
+
+The metrics are collected per name of the measured call. Every metric counts
+calls and failures, sums the payload sizes and keeps a histogram of latencies.
+The service process has only one registry of metrics.
+"""
+
+import copy
+import functools
+import logging
+import time
+from threading import Lock
+
+from dasbus.server.interface import dbus_signal
+
+from org_fedora_hello_world.constants import METRICS_LATENCY_BUCKETS
+from org_fedora_hello_world.structures import HelloWorldMetric
+
+log = logging.getLogger(__name__)
+
+__all__ = ["MetricsRegistry", "metrics", "instrument", "instrument_interface",
+           "get_payload_size"]
+
+
+def get_payload_size(value):
+    """Estimate the size of the payload.
+
+    Variants report their serialized size. Strings are measured in characters
+    and line stores in encoded bytes. Containers are measured recursively.
+
+    :param value: an argument or a result of the measured call
+    :return: a number of bytes
+    """
+    if value is None:
+        return 0
+
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+
+    if isinstance(value, (bool, int, float)):
+        return 8
+
+    if isinstance(value, dict):
+        return sum(get_payload_size(k) + get_payload_size(v) for k, v in value.items())
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(get_payload_size(item) for item in value)
+
+    # Variants and line stores know their sizes.
+    if hasattr(value, "get_size"):
+        return value.get_size()
+
+    if hasattr(value, "nbytes"):
+        return value.nbytes
+
+    return 0
+
+
+class MetricsRegistry:
+    """The registry of metrics.
+
+    The registry can be updated from multiple threads.
+    """
+
+    def __init__(self, buckets=METRICS_LATENCY_BUCKETS):
+        """Create a new registry.
+
+        :param buckets: upper bounds of the latency buckets in seconds
+        """
+        self._buckets = tuple(buckets)
+        self._lock = Lock()
+        self._metrics = {}
+
+    @property
+    def buckets(self):
+        """The upper bounds of the latency buckets in seconds."""
+        return self._buckets
+
+    def record(self, name, latency, payload_size=0, failed=False):
+        """Record one call.
+
+        :param name: a name of the metric
+        :param latency: a number of seconds
+        :param payload_size: a number of bytes
+        :param failed: has the call failed?
+        """
+        with self._lock:
+            metric = self._metrics.get(name)
+
+            if metric is None:
+                metric = self._metrics[name] = HelloWorldMetric()
+                metric.latency_histogram = [0] * (len(self._buckets) + 1)
+
+            metric.calls += 1
+            metric.failed_calls += failed
+            metric.total_latency += latency
+            metric.max_latency = max(metric.max_latency, latency)
+            metric.payload_size += payload_size
+            metric.latency_histogram[self._get_bucket(latency)] += 1
+
+    def _get_bucket(self, latency):
+        """Get an index of the latency bucket."""
+        for index, bound in enumerate(self._buckets):
+            if latency <= bound:
+                return index
+
+        return len(self._buckets)
+
+    def get_metrics(self):
+        """Get a copy of the metrics.
+
+        :return: a dictionary of names and instances of HelloWorldMetric
+        """
+        collected = {}
+
+        with self._lock:
+            for name, metric in self._metrics.items():
+                collected[name] = copy.copy(metric)
+                collected[name].latency_histogram = list(metric.latency_histogram)
+
+        return collected
+
+    def reset(self):
+        """Remove all metrics."""
+        with self._lock:
+            self._metrics.clear()
+
+    def log_summary(self):
+        """Write a summary of the metrics into the log."""
+        collected = self.get_metrics()
+        log.info("Collected %d metrics:", len(collected))
+
+        for name, metric in sorted(collected.items()):
+            log.info(
+                "%s: %d calls, %d failed, %.3f ms mean, %.3f ms max, %d bytes, histogram %s",
+                name, metric.calls, metric.failed_calls,
+                metric.total_latency / metric.calls * 1000, metric.max_latency * 1000,
+                metric.payload_size, metric.latency_histogram
+            )
+
+
+# The registry of the service process.
+metrics = MetricsRegistry()
+
+
+def instrument(function=None, name=None, payload=None):
+    """Measure calls of the method.
+
+    The metric is named after the class of the instance and the method
+    unless the name is given. The payload size is estimated from the
+    arguments and the result unless the payload function is given.
+
+    :param function: a method
+    :param name: a name of the metric or None
+    :param payload: a function that gets the result and the arguments
+                    and returns the payload size
+    :return: a wrapped method or a decorator
+    """
+    if function is None:
+        return functools.partial(instrument, name=name, payload=payload)
+
+    @functools.wraps(function)
+    def _wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        result = None
+        failed = True
+
+        try:
+            result = function(self, *args, **kwargs)
+            failed = False
+            return result
+        finally:
+            latency = time.perf_counter() - start
+
+            if payload is not None and not failed:
+                size = payload(result, self, *args, **kwargs)
+            else:
+                size = get_payload_size(args) + get_payload_size(kwargs) \
+                    + get_payload_size(result)
+
+            metrics.record(
+                name or "{}.{}".format(type(self).__name__, function.__name__),
+                latency, size, failed
+            )
+
+    return _wrapper
+
+
+def instrument_interface(cls):
+    """Measure all D-Bus methods and properties of the interface class.
+
+    The class decorator has to be applied before dbus_interface, so the XML
+    specification is generated from the measured members. Signals are not
+    measured. The members inherited from the parent classes are measured
+    in this class, the parent classes are not changed.
+
+    :param cls: a class of the interface
+    :return: the same class
+    """
+    members = {}
+
+    # Collect the members of the parent classes first, so they are
+    # overridden by the members of the subclasses.
+    for base in reversed(cls.__mro__):
+        members.update(vars(base))
+
+    for member_name, member in members.items():
+        if not member_name[:1].isupper() or isinstance(member, dbus_signal):
+            continue
+
+        if isinstance(member, property):
+            fget = instrument(member.fget, name="{}.{}".format(cls.__name__, member_name))
+            setattr(cls, member_name, property(fget, member.fset, member.fdel, member.__doc__))
+        elif callable(member):
+            setattr(cls, member_name, instrument(member))
+
+    return cls
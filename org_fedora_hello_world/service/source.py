@@ -0,0 +1,179 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module contains the external payload source of the service."""
+
+import logging
+import mmap
+import os
+
+from org_fedora_hello_world.constants import WRITE_BUFFER_SIZE
+from org_fedora_hello_world.service.digest import LineDigest
+
+log = logging.getLogger(__name__)
+
+__all__ = ["SourceFile"]
+
+
+class SourceFile:
+    """A reference to a file with the payload.
+
+    The file is never loaded into memory. It is read in blocks when it is
+    described or written into the installed system. Iteration yields the
+    encoded lines of the file.
+    """
+
+    def __init__(self, path):
+        """Create a new reference.
+
+        :param path: a path to the file
+        """
+        self._path = path
+        self._description = None
+
+    @property
+    def path(self):
+        """The path to the file."""
+        return self._path
+
+    def describe(self):
+        """Describe the content of the file.
+
+        The file is read only once, the description is cached.
+
+        :return: a tuple with the number of lines, the size in bytes,
+                 the digest of lines and the last byte
+        :raise: OSError if the file can't be read
+        """
+        if self._description is not None:
+            return self._description
+
+        count = 0
+        size = 0
+        last = b""
+
+        def _measure(lines):
+            nonlocal count, size, last
+
+            for line in lines:
+                count += 1
+                size += len(line)
+                last = line[-1:]
+                yield line
+
+        # The digest is the same as the digest of a line store with the lines.
+        digest = LineDigest(_measure(self))
+        self._description = (count, size, digest.hexdigest(), last)
+        log.debug("The source %s has %d lines and %d bytes.", self._path, count, size)
+        return self._description
+
+    def iterate_blocks(self, block_size=WRITE_BUFFER_SIZE):
+        """Iterate over blocks of the file.
+
+        :param block_size: a size of blocks in bytes
+        :return: an iterator of bytes
+        """
+        with open(self._path, "rb") as f:
+            while True:
+                block = f.read(block_size)
+
+                if not block:
+                    break
+
+                yield block
+
+    def iterate_reversed_blocks(self, block_size=WRITE_BUFFER_SIZE):
+        """Iterate over blocks of the lines of the file in the reversed order.
+
+        The file is mapped into memory and processed from its end in regions
+        of whole lines of roughly the given size. The lines of every region
+        are reversed as bytes, they are never decoded. The last line is
+        terminated with the line ending if it is missing.
+
+        :param block_size: a size of blocks in bytes
+        :return: an iterator of bytes
+        """
+        with open(self._path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+
+            if not size:
+                return
+
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as data:
+                yield from _iterate_reversed_regions(data, size, block_size)
+
+    def _is_terminated(self):
+        """Check that the file ends with the line ending."""
+        with open(self._path, "rb") as f:
+            if not f.seek(0, os.SEEK_END):
+                return True
+
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def __len__(self):
+        return self.describe()[0]
+
+    def __iter__(self):
+        with open(self._path, "rb") as f:
+            yield from f
+
+    def __reversed__(self):
+        # The reversed blocks terminate the last line, so it is restored.
+        terminated = self._is_terminated()
+
+        for block in self.iterate_reversed_blocks():
+            for line in _iterate_block_lines(block):
+                if not terminated:
+                    line = line[:-1]
+                    terminated = True
+
+                yield line
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, self._path)
+
+
+def _iterate_reversed_regions(data, size, block_size):
+    """Iterate over the reversed regions of the mapped file."""
+    end = size
+    terminate = data[size - 1:size] != b"\n"
+
+    while end > 0:
+        # Start the region after a line ending, so it has only whole lines.
+        start = data.rfind(b"\n", 0, max(end - block_size, 0)) + 1
+        region = data[start:end]
+
+        if terminate:
+            region += b"\n"
+            terminate = False
+
+        lines = region[:-1].split(b"\n")
+        lines.reverse()
+        yield b"\n".join(lines) + b"\n"
+        end = start
+
+
+def _iterate_block_lines(block):
+    """Iterate over the lines of a block that ends with the line ending."""
+    start = 0
+
+    while start < len(block):
+        end = block.index(b"\n", start) + 1
+        yield block[start:end]
+        start = end
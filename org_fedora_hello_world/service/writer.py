@@ -0,0 +1,452 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module contains the engine that writes files into the target system."""
+
+import errno
+import logging
+import mmap
+import os
+import tempfile
+
+from org_fedora_hello_world.constants import ENCODING, WRITE_BUFFER_SIZE, FSYNC_NONE, \
+    FSYNC_FILE, FSYNC_FULL
+from org_fedora_hello_world.service.line_store import BaseLineStore
+from org_fedora_hello_world.service.source import SourceFile
+
+log = logging.getLogger(__name__)
+
+__all__ = ["FileWriter", "iterate_lines", "iterate_encoded_lines", "get_encoded_size"]
+
+# The mode of newly created files.
+DEFAULT_FILE_MODE = 0o644
+
+# The errors of copy_file_range and sendfile that mean they are not supported
+# for the given files, so the next copy method should be used.
+UNSUPPORTED_COPY_ERRORS = (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+                           errno.EBADF, errno.ETXTBSY)
+
+# The maximal number of buffers passed to a single writev call.
+try:
+    IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (ValueError, OSError):
+    IOV_MAX = 1024
+
+
+def iterate_lines(lines, reverse=False):
+    """Iterate over the lines in the order they should be written.
+
+    Last line could be missing the trailing line ending if it came from GUI.
+    That breaks the reversed output, so make sure it is there. The given
+    lines are never modified.
+
+    :param lines: a sequence of strings or bytes
+    :param reverse: should the lines be reversed?
+    :return: an iterator of lines
+    """
+    if reverse:
+        iterator = reversed(lines)
+        last = next(iterator, None)
+
+        if last is not None:
+            yield _terminate_line(last)
+
+        yield from iterator
+        return
+
+    iterator = iter(lines)
+    previous = next(iterator, None)
+
+    if previous is None:
+        return
+
+    for line in iterator:
+        yield previous
+        previous = line
+
+    yield _terminate_line(previous)
+
+
+def iterate_encoded_lines(lines, reverse=False):
+    """Iterate over the encoded lines in the order they should be written.
+
+    Lines of a line store or a source file are already encoded, so they
+    are not decoded.
+
+    :param lines: a sequence of lines, a line store or a source file
+    :param reverse: should the lines be reversed?
+    :return: an iterator of bytes
+    """
+    if isinstance(lines, BaseLineStore):
+        return iterate_lines(lines.encoded, reverse)
+
+    if isinstance(lines, SourceFile):
+        return iterate_lines(lines, reverse)
+
+    return (line.encode(ENCODING) for line in iterate_lines(lines, reverse))
+
+
+def get_encoded_size(lines):
+    """Get the size of the encoded lines in the order they should be written.
+
+    The size is known only for line stores and source files.
+
+    :param lines: a sequence of lines, a line store or a source file
+    :return: a number of bytes or None
+    """
+    if isinstance(lines, SourceFile):
+        _count, size, _digest, last = lines.describe()
+        return size + 1 if last and last != b"\n" else size
+
+    if not isinstance(lines, BaseLineStore):
+        return None
+
+    if lines and not lines.get_encoded(-1).endswith(b"\n"):
+        return lines.nbytes + 1
+
+    return lines.nbytes
+
+
+def _terminate_line(line):
+    """Make sure that the line ends with the line ending."""
+    ending = "\n" if isinstance(line, str) else b"\n"
+
+    if line.endswith(ending):
+        return line
+
+    return line + ending
+
+
+def _terminate_blocks(blocks):
+    """Make sure that the blocks of bytes end with the line ending."""
+    last = b""
+
+    for block in blocks:
+        yield block
+        last = block[-1:]
+
+    if last and last != b"\n":
+        yield b"\n"
+
+
+def _iterate_store_blocks(store):
+    """Iterate over blocks of the line store with the terminated last line."""
+    terminate = bool(store) and not store.get_encoded(-1).endswith(b"\n")
+    yield from store.iterate_blocks()
+
+    if terminate:
+        yield b"\n"
+
+
+class FileWriter:
+    """The writer of files in the target system.
+
+    The data are collected into batches of the given size and every batch
+    is written with a single vectored system call. The data are written into
+    a temporary file in the same directory that replaces the target file
+    only after all data are written, so the target file is never left
+    half-written.
+    """
+
+    def __init__(self, path, buffer_size=WRITE_BUFFER_SIZE, fsync_policy=FSYNC_FILE,
+                 progress_callback=None):
+        """Create a new writer.
+
+        :param path: a path to the target file
+        :param buffer_size: a size of batches in bytes
+        :param fsync_policy: one of the FSYNC_* policies
+        :param progress_callback: a function called with the size of every
+                                  written batch or None
+        """
+        if buffer_size <= 0:
+            raise ValueError("Invalid buffer size: {}".format(buffer_size))
+
+        if fsync_policy not in (FSYNC_NONE, FSYNC_FILE, FSYNC_FULL):
+            raise ValueError("Invalid fsync policy: {}".format(fsync_policy))
+
+        self._path = path
+        self._buffer_size = buffer_size
+        self._fsync_policy = fsync_policy
+        self._progress_callback = progress_callback
+
+    @property
+    def path(self):
+        """The path to the target file."""
+        return self._path
+
+    def write_lines(self, lines, reverse=False):
+        """Write the given lines into the target file.
+
+        A source file is copied by the kernel unless it is reversed.
+
+        :param lines: a sequence of lines, a line store or a source file
+        :param reverse: should the lines be written in the reversed order?
+        :return: a number of written bytes
+        """
+        if isinstance(lines, SourceFile) and not reverse:
+            return self.copy(lines)
+
+        return self.write(self._iterate_blocks(lines, reverse))
+
+    def is_unchanged(self, lines, reverse=False):
+        """Check if the target file already contains the given lines.
+
+        The planned content is streamed and compared with the target file,
+        so nothing has to be written if they are the same. The sizes are
+        compared first if the size of the planned content is known.
+
+        :param lines: a sequence of lines, a line store or a source file
+        :param reverse: should the lines be written in the reversed order?
+        :return: True if the content of the target file is the same
+        """
+        try:
+            target_file = open(self._path, "rb", buffering=self._buffer_size)
+        except FileNotFoundError:
+            return False
+
+        with target_file:
+            size = get_encoded_size(lines)
+
+            if size is not None and os.fstat(target_file.fileno()).st_size != size:
+                return False
+
+            for block in self._iterate_blocks(lines, reverse):
+                if target_file.read(len(block)) != block:
+                    return False
+
+            return not target_file.read(1)
+
+    def _iterate_blocks(self, lines, reverse):
+        """Iterate over the blocks of bytes that should be written."""
+        if isinstance(lines, SourceFile):
+            if reverse:
+                return lines.iterate_reversed_blocks(self._buffer_size)
+
+            return _terminate_blocks(lines.iterate_blocks(self._buffer_size))
+
+        if isinstance(lines, BaseLineStore) and not reverse:
+            return _iterate_store_blocks(lines)
+
+        # The lines are already in memory, so they are reversed directly.
+        # The compressed blocks are decompressed one by one from the end.
+        return iterate_encoded_lines(lines, reverse)
+
+    def write(self, blocks):
+        """Write the given blocks of bytes into the target file.
+
+        :param blocks: an iterable of bytes
+        :return: a number of written bytes
+        """
+        return self._replace_file(lambda fd: self._write_blocks(fd, blocks))
+
+    def copy(self, source):
+        """Copy the given source file into the target file.
+
+        The data are copied by the kernel with copy_file_range or sendfile,
+        so they never pass through Python objects. If neither of them is
+        supported for the files, the source file is mapped into memory and
+        written in batches. The last line is terminated with the line ending
+        if it is missing.
+
+        :param source: a source file
+        :return: a number of written bytes
+        """
+        return self._replace_file(lambda fd: self._copy_file(fd, source.path))
+
+    def _replace_file(self, write_function):
+        """Write a temporary file and replace the target file with it.
+
+        :param write_function: a function that writes into the given file descriptor
+        :return: a number of written bytes
+        """
+        directory, name = os.path.split(self._path)
+        fd, temporary_path = tempfile.mkstemp(prefix="." + name + ".", dir=directory or ".")
+
+        try:
+            size = write_function(fd)
+            os.fchmod(fd, self._get_file_mode())
+
+            if self._fsync_policy != FSYNC_NONE:
+                os.fsync(fd)
+
+            os.close(fd)
+            fd = None
+            os.replace(temporary_path, self._path)
+        except BaseException:
+            if fd is not None:
+                os.close(fd)
+
+            os.unlink(temporary_path)
+            raise
+
+        if self._fsync_policy == FSYNC_FULL:
+            self._sync_directory(directory)
+
+        return size
+
+    def _write_blocks(self, fd, blocks):
+        """Write the blocks in batches."""
+        size = 0
+        batch = []
+        batch_size = 0
+
+        for block in blocks:
+            batch.append(block)
+            batch_size += len(block)
+
+            if batch_size >= self._buffer_size or len(batch) >= IOV_MAX:
+                self._write_batch(fd, batch, batch_size)
+                self._report_progress(batch_size)
+                size += batch_size
+                batch = []
+                batch_size = 0
+
+        if batch:
+            self._write_batch(fd, batch, batch_size)
+            self._report_progress(batch_size)
+            size += batch_size
+
+        return size
+
+    def _report_progress(self, size):
+        """Report the size of a written batch."""
+        if self._progress_callback:
+            self._progress_callback(size)
+
+    def _copy_file(self, fd, source_path):
+        """Copy the source file with the fastest supported method."""
+        with open(source_path, "rb") as source_file:
+            source_fd = source_file.fileno()
+            size = os.fstat(source_fd).st_size
+            offset = 0
+
+            for copy_range in (self._copy_file_range, self._send_file, self._copy_mapped):
+                offset = copy_range(source_fd, fd, offset, size)
+
+                if offset >= size:
+                    break
+
+            if size and os.pread(source_fd, 1, size - 1) != b"\n":
+                self._write_batch(fd, [b"\n"], 1)
+                self._report_progress(1)
+                offset += 1
+
+        return offset
+
+    def _copy_file_range(self, source_fd, fd, offset, size):
+        """Copy the data with copy_file_range.
+
+        :return: an offset of the first byte that is not copied
+        """
+        if not hasattr(os, "copy_file_range"):
+            return offset
+
+        return self._copy_in_kernel(
+            lambda position, count: os.copy_file_range(source_fd, fd, count, position),
+            offset,
+            size
+        )
+
+    def _send_file(self, source_fd, fd, offset, size):
+        """Copy the data with sendfile.
+
+        :return: an offset of the first byte that is not copied
+        """
+        return self._copy_in_kernel(
+            lambda position, count: os.sendfile(fd, source_fd, position, count),
+            offset,
+            size
+        )
+
+    def _copy_in_kernel(self, copy_function, offset, size):
+        """Copy the data in chunks with the given system call.
+
+        The copy function is called with the offset in the source file and
+        the number of bytes to copy. The position in the target file is
+        advanced by the system call.
+
+        :return: an offset of the first byte that is not copied
+        """
+        start = offset
+
+        while offset < size:
+            try:
+                copied = copy_function(offset, min(self._buffer_size, size - offset))
+            except OSError as e:
+                # Fall back only if nothing is copied yet.
+                if e.errno not in UNSUPPORTED_COPY_ERRORS or offset != start:
+                    raise
+
+                log.debug("Failed to copy data in the kernel: %s", e)
+                return offset
+
+            if not copied:
+                break
+
+            offset += copied
+            self._report_progress(copied)
+
+        return offset
+
+    def _copy_mapped(self, source_fd, fd, offset, size):
+        """Copy the data with buffered writes from the mapped file.
+
+        :return: an offset of the first byte that is not copied
+        """
+        with mmap.mmap(source_fd, size, access=mmap.ACCESS_READ) as data, \
+                memoryview(data) as view:
+            blocks = (
+                view[position:position + self._buffer_size]
+                for position in range(offset, size, self._buffer_size)
+            )
+            return offset + self._write_blocks(fd, blocks)
+
+    @staticmethod
+    def _write_batch(fd, batch, batch_size):
+        """Write one batch with a vectored write."""
+        written = os.writev(fd, batch)
+
+        if written == batch_size:
+            return
+
+        # Finish a partial write.
+        remaining = memoryview(b"".join(batch))[written:]
+
+        while remaining:
+            written = os.write(fd, remaining)
+            remaining = remaining[written:]
+
+    def _get_file_mode(self):
+        """Get the mode of the written file.
+
+        Keep the mode of the replaced file if there is any.
+        """
+        try:
+            return os.stat(self._path).st_mode & 0o7777
+        except FileNotFoundError:
+            return DEFAULT_FILE_MODE
+
+    @staticmethod
+    def _sync_directory(directory):
+        """Synchronize the directory entries."""
+        fd = os.open(directory or ".", os.O_RDONLY | os.O_DIRECTORY)
+
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
@@ -0,0 +1,467 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module contains D-Bus structures shared by the service and the user interfaces."""
+
+from dasbus.structure import DBusData
+from dasbus.typing import *  # pylint: disable=wildcard-import,unused-wildcard-import
+
+__all__ = ["HelloWorldSummary", "HelloWorldConfiguration", "HelloWorldValidationRules",
+           "HelloWorldValidationReport", "HelloWorldStatistics",
+           "HelloWorldMetric"]
+
+
+class HelloWorldSummary(DBusData):
+    """Summary of the Hello World data."""
+
+    def __init__(self):
+        self._line_count = 0
+        self._size = 0
+        self._reverse = False
+        self._version = 0
+        self._digest = ""
+
+    @property
+    def line_count(self) -> UInt64:
+        """Number of lines.
+
+        :return: a number of lines
+        """
+        return self._line_count
+
+    @line_count.setter
+    def line_count(self, value: UInt64):
+        self._line_count = value
+
+    @property
+    def size(self) -> UInt64:
+        """Size of the encoded lines in bytes.
+
+        :return: a number of bytes
+        """
+        return self._size
+
+    @size.setter
+    def size(self, value: UInt64):
+        self._size = value
+
+    @property
+    def reverse(self) -> Bool:
+        """Whether to reverse order of lines.
+
+        :return: True or False
+        """
+        return self._reverse
+
+    @reverse.setter
+    def reverse(self, value: Bool):
+        self._reverse = value
+
+    @property
+    def version(self) -> UInt64:
+        """Version of the data.
+
+        The version increases with every change of the data.
+
+        :return: a number
+        """
+        return self._version
+
+    @version.setter
+    def version(self, value: UInt64):
+        self._version = value
+
+    @property
+    def digest(self) -> Str:
+        """Digest of the encoded lines.
+
+        It is a SHA-256 digest of the SHA-256 digests of chunks of lines,
+        so it can be updated after an edit of the lines.
+
+        :return: a hexadecimal string
+        """
+        return self._digest
+
+    @digest.setter
+    def digest(self, value: Str):
+        self._digest = value
+
+
+class HelloWorldConfiguration(DBusData):
+    """Configuration of the Hello World data."""
+
+    def __init__(self):
+        self._reverse = False
+        self._lines = []
+        self._source = ""
+
+    @property
+    def reverse(self) -> Bool:
+        """Whether to reverse order of lines.
+
+        :return: True or False
+        """
+        return self._reverse
+
+    @reverse.setter
+    def reverse(self, value: Bool):
+        self._reverse = value
+
+    @property
+    def lines(self) -> List[Str]:
+        """Lines of the hello world file.
+
+        :return: a list of lines
+        """
+        return self._lines
+
+    @lines.setter
+    def lines(self, value: List[Str]):
+        self._lines = value
+
+    @property
+    def source(self) -> Str:
+        """Path to the file with the text of the hello world file.
+
+        The text is read from the file instead of the lines.
+
+        :return: a path or an empty string
+        """
+        return self._source
+
+    @source.setter
+    def source(self, value: Str):
+        self._source = value
+
+
+class HelloWorldValidationRules(DBusData):
+    """Rules for validation of the Hello World lines."""
+
+    def __init__(self):
+        self._max_line_length = 0
+        self._max_size = 0
+        self._charset = ""
+        self._patterns = []
+
+    @property
+    def max_line_length(self) -> UInt64:
+        """Maximal number of characters of a line without the line ending.
+
+        :return: a number of characters or 0 for no limit
+        """
+        return self._max_line_length
+
+    @max_line_length.setter
+    def max_line_length(self, value: UInt64):
+        self._max_line_length = value
+
+    @property
+    def max_size(self) -> UInt64:
+        """Maximal size of the written file.
+
+        :return: a number of bytes or 0 for no limit
+        """
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, value: UInt64):
+        self._max_size = value
+
+    @property
+    def charset(self) -> Str:
+        """Name of a charset that has to be able to encode every line.
+
+        For example: ascii or latin-1
+
+        :return: a name of the charset or an empty string for any
+        """
+        return self._charset
+
+    @charset.setter
+    def charset(self, value: Str):
+        self._charset = value
+
+    @property
+    def patterns(self) -> List[Str]:
+        """Regular expressions allowed for lines.
+
+        Every line without the line ending has to fully match at least
+        one of the patterns.
+
+        :return: a list of regular expressions or an empty list for any
+        """
+        return self._patterns
+
+    @patterns.setter
+    def patterns(self, value: List[Str]):
+        self._patterns = value
+
+
+class HelloWorldValidationReport(DBusData):
+    """Report of the validation of the Hello World lines."""
+
+    def __init__(self):
+        self._valid = True
+        self._line_count = 0
+        self._size = 0
+        self._max_line_length = 0
+        self._invalid_line_count = 0
+        self._messages = []
+
+    @property
+    def valid(self) -> Bool:
+        """Whether the lines are valid.
+
+        :return: True or False
+        """
+        return self._valid
+
+    @valid.setter
+    def valid(self, value: Bool):
+        self._valid = value
+
+    @property
+    def line_count(self) -> UInt64:
+        """Number of checked lines.
+
+        :return: a number of lines
+        """
+        return self._line_count
+
+    @line_count.setter
+    def line_count(self, value: UInt64):
+        self._line_count = value
+
+    @property
+    def size(self) -> UInt64:
+        """Size of the written file.
+
+        :return: a number of bytes
+        """
+        return self._size
+
+    @size.setter
+    def size(self, value: UInt64):
+        self._size = value
+
+    @property
+    def max_line_length(self) -> UInt64:
+        """Length of the longest line without the line ending.
+
+        :return: a number of characters
+        """
+        return self._max_line_length
+
+    @max_line_length.setter
+    def max_line_length(self, value: UInt64):
+        self._max_line_length = value
+
+    @property
+    def invalid_line_count(self) -> UInt64:
+        """Number of invalid lines.
+
+        :return: a number of lines
+        """
+        return self._invalid_line_count
+
+    @invalid_line_count.setter
+    def invalid_line_count(self, value: UInt64):
+        self._invalid_line_count = value
+
+    @property
+    def messages(self) -> List[Str]:
+        """Messages about the first found problems.
+
+        :return: a list of messages
+        """
+        return self._messages
+
+    @messages.setter
+    def messages(self, value: List[Str]):
+        self._messages = value
+
+
+class HelloWorldStatistics(DBusData):
+    """Statistics of the Hello World lines."""
+
+    def __init__(self):
+        self._line_count = 0
+        self._blank_line_count = 0
+        self._word_count = 0
+        self._character_count = 0
+        self._max_line_length = 0
+        self._size = 0
+
+    @property
+    def line_count(self) -> UInt64:
+        """Number of lines.
+
+        :return: a number of lines
+        """
+        return self._line_count
+
+    @line_count.setter
+    def line_count(self, value: UInt64):
+        self._line_count = value
+
+    @property
+    def blank_line_count(self) -> UInt64:
+        """Number of blank lines.
+
+        :return: a number of lines
+        """
+        return self._blank_line_count
+
+    @blank_line_count.setter
+    def blank_line_count(self, value: UInt64):
+        self._blank_line_count = value
+
+    @property
+    def word_count(self) -> UInt64:
+        """Number of words separated by whitespace.
+
+        :return: a number of words
+        """
+        return self._word_count
+
+    @word_count.setter
+    def word_count(self, value: UInt64):
+        self._word_count = value
+
+    @property
+    def character_count(self) -> UInt64:
+        """Number of characters without the line endings.
+
+        :return: a number of characters
+        """
+        return self._character_count
+
+    @character_count.setter
+    def character_count(self, value: UInt64):
+        self._character_count = value
+
+    @property
+    def max_line_length(self) -> UInt64:
+        """Length of the longest line without the line ending.
+
+        :return: a number of characters
+        """
+        return self._max_line_length
+
+    @max_line_length.setter
+    def max_line_length(self, value: UInt64):
+        self._max_line_length = value
+
+    @property
+    def size(self) -> UInt64:
+        """Size of the written file.
+
+        :return: a number of bytes
+        """
+        return self._size
+
+    @size.setter
+    def size(self, value: UInt64):
+        self._size = value
+
+
+class HelloWorldMetric(DBusData):
+    """Metric of calls of the Hello World service."""
+
+    def __init__(self):
+        self._calls = 0
+        self._failed_calls = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+        self._payload_size = 0
+        self._latency_histogram = []
+
+    @property
+    def calls(self) -> UInt64:
+        """Number of calls.
+
+        :return: a number of calls
+        """
+        return self._calls
+
+    @calls.setter
+    def calls(self, value: UInt64):
+        self._calls = value
+
+    @property
+    def failed_calls(self) -> UInt64:
+        """Number of calls that raised an exception.
+
+        :return: a number of calls
+        """
+        return self._failed_calls
+
+    @failed_calls.setter
+    def failed_calls(self, value: UInt64):
+        self._failed_calls = value
+
+    @property
+    def total_latency(self) -> Double:
+        """Total time spent in the calls.
+
+        :return: a number of seconds
+        """
+        return self._total_latency
+
+    @total_latency.setter
+    def total_latency(self, value: Double):
+        self._total_latency = value
+
+    @property
+    def max_latency(self) -> Double:
+        """Time spent in the slowest call.
+
+        :return: a number of seconds
+        """
+        return self._max_latency
+
+    @max_latency.setter
+    def max_latency(self, value: Double):
+        self._max_latency = value
+
+    @property
+    def payload_size(self) -> UInt64:
+        """Total size of the arguments and the results.
+
+        :return: a number of bytes
+        """
+        return self._payload_size
+
+    @payload_size.setter
+    def payload_size(self, value: UInt64):
+        self._payload_size = value
+
+    @property
+    def latency_histogram(self) -> List[UInt64]:
+        """Numbers of calls in the latency buckets.
+
+        The buckets are bounded by METRICS_LATENCY_BUCKETS. The last
+        bucket counts the calls slower than the last bound.
+
+        :return: a list of numbers of calls
+        """
+        return self._latency_histogram
+
+    @latency_histogram.setter
+    def latency_histogram(self, value: List[UInt64]):
+        self._latency_histogram = value
@@ -30,10 +30,11 @@
 import logging
 import re
 
+from dasbus.error import DBusError
 from simpleline.render.prompt import Prompt
 from simpleline.render.screen import InputState
 from simpleline.render.containers import ListColumnContainer
-from simpleline.render.widgets import CheckboxWidget, EntryWidget
+from simpleline.render.widgets import CheckboxWidget, EntryWidget, TextWidget
 
 from pyanaconda.core.constants import PASSWORD_POLICY_ROOT
 from pyanaconda.ui.tui.spokes import NormalTUISpoke
@@ -42,8 +43,10 @@ from pyanaconda.ui.common import FirstbootSpokeMixIn
 from pyanaconda.ui.tui.tuiobject import Dialog, PasswordDialog
 
 # the path to addons is in sys.path so we can import things from org_fedora_hello_world
+from org_fedora_hello_world.cached_proxy import get_cached_proxy
 from org_fedora_hello_world.categories.hello_world import HelloWorldCategory
-from org_fedora_hello_world.constants import HELLO_WORLD
+from org_fedora_hello_world.constants import TEXT_PREVIEW_PAGE_LINES
+from org_fedora_hello_world.structures import HelloWorldSummary, HelloWorldConfiguration
 
 log = logging.getLogger(__name__)
 
@@ -57,6 +60,13 @@ __all__ = ["HelloWorldSpoke", "HelloWorldEditSpoke"]
 _ = lambda x: x
 N_ = lambda x: x
 
+# keys of the prompt options that switch pages of the preview
+NEXT_PAGE_KEY = "n"
+PREVIOUS_PAGE_KEY = "p"
+
+# the line that finishes the line-by-line input
+END_OF_INPUT = "."
+
 
 class HelloWorldSpoke(FirstbootSpokeMixIn, NormalTUISpoke):
     """
@@ -83,10 +93,14 @@ class HelloWorldSpoke(FirstbootSpokeMixIn, NormalTUISpoke):
         """
         super().__init__(*args, **kwargs)
         self.title = N_("Hello World")
-        self._hello_world_module = HELLO_WORLD.get_proxy()
+        self._hello_world_module = get_cached_proxy()
         self._container = None
         self._reverse = False
-        self._lines = ""
+        self._source = ""
+        self._line_count = 0
+        self._lines = None
+        self._page = 0
+        self._error = ""
 
     def initialize(self):
         """
@@ -108,10 +122,21 @@ class HelloWorldSpoke(FirstbootSpokeMixIn, NormalTUISpoke):
         super().setup(args)
 
         self._reverse = self._hello_world_module.Reverse
-        self._lines = self._hello_world_module.Lines
+        self._update_lines_state()
 
         return True
 
+    def _update_lines_state(self):
+        """Update the state of the lines from the D-Bus service.
+
+        Read only the summary, the lines are fetched page by page.
+        """
+        summary = HelloWorldSummary.from_structure(self._hello_world_module.Summary)
+        self._source = self._hello_world_module.Source
+        self._line_count = summary.line_count
+        self._lines = None
+        self._page = 0
+
     def refresh(self, args=None):
         """
         The refresh method that is called every time the spoke is displayed.
@@ -139,21 +164,91 @@ class HelloWorldSpoke(FirstbootSpokeMixIn, NormalTUISpoke):
         self._container.add(
             EntryWidget(
                 title="Hello world text",
-                value="".join(self._lines)
+                value=_("{} lines").format(self._line_count)
             ),
             callback=self._change_lines
         )
+        self._container.add(
+            TextWidget(_("Type new text line by line")),
+            callback=self._stream_lines
+        )
+        self._container.add(
+            TextWidget(_("Import text from a local file")),
+            callback=self._import_lines
+        )
 
         self.window.add_with_separator(self._container)
 
+        if self._error:
+            self.window.add_with_separator(TextWidget(self._error))
+            self._error = ""
+
+        self.window.add_with_separator(TextWidget(self._get_preview()))
+
+    def _get_page_count(self):
+        """Get the number of pages of the preview."""
+        return max((self._line_count - 1) // TEXT_PREVIEW_PAGE_LINES + 1, 1)
+
+    def _get_preview(self):
+        """Get the text of the current page of the preview.
+
+        Only the lines of the page are fetched from the D-Bus service,
+        so the cost doesn't depend on the size of the text.
+        """
+        start = self._page * TEXT_PREVIEW_PAGE_LINES
+
+        if self._lines is not None:
+            lines = self._lines[start:start + TEXT_PREVIEW_PAGE_LINES]
+        elif self._source:
+            return _("The text is read from {}.").format(self._source)
+        else:
+            lines = self._hello_world_module.GetLines(start, TEXT_PREVIEW_PAGE_LINES)
+
+        if not lines:
+            return _("No text set")
+
+        header = _("Lines {first}-{last} of {count} (page {page} of {pages}):").format(
+            first=start + 1,
+            last=start + len(lines),
+            count=self._line_count,
+            page=self._page + 1,
+            pages=self._get_page_count()
+        )
+        return header + "\n" + "".join(lines).rstrip("\n")
+
+    def prompt(self, args=None):
+        """Add the options that switch pages of the preview to the prompt.
+
+        :see: simpleline.render.screen.UIScreen.prompt
+        """
+        prompt = super().prompt(args)
+
+        if self._page + 1 < self._get_page_count():
+            prompt.add_option(NEXT_PAGE_KEY, _("to show the next page"))
+
+        if self._page > 0:
+            prompt.add_option(PREVIOUS_PAGE_KEY, _("to show the previous page"))
+
+        return prompt
+
     def apply(self):
         """
         The apply method is not called automatically for TUI. It should be called
         in input() if required. It should update the contents of internal data
         structures with values set in the spoke.
+
+        The lines are sent only if they were edited.
         """
-        self._hello_world_module.SetReverse(self._reverse)
-        self._hello_world_module.SetLines(self._lines)
+        if self._lines is None:
+            self._hello_world_module.SetReverse(self._reverse)
+            return
+
+        configuration = HelloWorldConfiguration()
+        configuration.reverse = self._reverse
+        configuration.lines = self._lines
+        self._hello_world_module.SetConfiguration(
+            HelloWorldConfiguration.to_structure(configuration)
+        )
 
     def execute(self):
         """
@@ -173,7 +268,8 @@ class HelloWorldSpoke(FirstbootSpokeMixIn, NormalTUISpoke):
 
         :rtype: bool
         """
-        return bool(self._hello_world_module.Lines)
+        summary = HelloWorldSummary.from_structure(self._hello_world_module.Summary)
+        return bool(summary.line_count)
 
     @property
     def status(self):
@@ -185,17 +281,15 @@ class HelloWorldSpoke(FirstbootSpokeMixIn, NormalTUISpoke):
 
         :rtype: str
         """
-        lines = self._hello_world_module.Lines
+        summary = HelloWorldSummary.from_structure(self._hello_world_module.Summary)
 
-        if not lines:
+        if not summary.line_count:
             return _("No text set")
 
-        reverse = self._hello_world_module.Reverse
-
-        if reverse:
-            return _("Text set with {} lines to reverse").format(len(lines))
+        if summary.reverse:
+            return _("Text set with {} lines to reverse").format(summary.line_count)
         else:
-            return _("Text set with {} lines").format(len(lines))
+            return _("Text set with {} lines").format(summary.line_count)
 
     def input(self, args, key):
         """
@@ -214,6 +308,14 @@ class HelloWorldSpoke(FirstbootSpokeMixIn, NormalTUISpoke):
         if self._container.process_user_input(key):
             return InputState.PROCESSED_AND_REDRAW
 
+        if key.lower() == NEXT_PAGE_KEY and self._page + 1 < self._get_page_count():
+            self._page += 1
+            return InputState.PROCESSED_AND_REDRAW
+
+        if key.lower() == PREVIOUS_PAGE_KEY and self._page > 0:
+            self._page -= 1
+            return InputState.PROCESSED_AND_REDRAW
+
         if key.lower() == Prompt.CONTINUE:
             self.apply()
             self.execute()
@@ -240,6 +342,57 @@ class HelloWorldSpoke(FirstbootSpokeMixIn, NormalTUISpoke):
         dialog = Dialog("Lines")
         result = dialog.run()
         self._lines = result.splitlines(True)
+        self._line_count = len(self._lines)
+        self._source = ""
+        self._page = 0
+
+    def _stream_lines(self, data):  # pylint: disable=unused-argument
+        """Callback when user wants to type new lines one by one.
+
+        Every line is sent to the D-Bus service right after it is entered,
+        so the text is never collected in the spoke. The first line replaces
+        the current lines, so they are kept if no line is entered.
+
+        :param data: can be passed when adding callback in container (not used here)
+        :type data: anything
+        """
+        first = True
+
+        while True:
+            dialog = Dialog(_("Line ('{}' to finish)").format(END_OF_INPUT))
+            line = dialog.run()
+
+            if line == END_OF_INPUT:
+                break
+
+            if first:
+                self._hello_world_module.SetLines([line + "\n"])
+                first = False
+            else:
+                self._hello_world_module.AppendLines([line + "\n"])
+
+        self._update_lines_state()
+
+    def _import_lines(self, data):  # pylint: disable=unused-argument
+        """Callback when user wants to import the text from a local file.
+
+        The file is read by the D-Bus service, the text doesn't pass
+        through the spoke.
+
+        :param data: can be passed when adding callback in container (not used here)
+        :type data: anything
+        """
+        dialog = Dialog(_("Path to the file"))
+        path = dialog.run()
+
+        try:
+            self._hello_world_module.ImportLines(path)
+        except DBusError as e:
+            log.error("Failed to import lines from %s: %s", path, e)
+            self._error = _("Failed to import the text: {}").format(e)
+            return
+
+        self._update_lines_state()
 
 
 class HelloWorldEditSpoke(NormalTUISpoke):
@@ -0,0 +1,147 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import unittest
+
+from dasbus.signal import Signal
+from dasbus.typing import *  # pylint: disable=wildcard-import,unused-wildcard-import
+
+from org_fedora_hello_world.cached_proxy import CachedProxy, CACHED_PROPERTIES, \
+    INVALIDATING_SIGNALS
+from org_fedora_hello_world.structures import HelloWorldSummary
+
+
+class FakeProxy:
+    """A fake proxy of the service.
+
+    The values of properties are returned the same way a real proxy
+    returns them, the reads are counted.
+    """
+
+    def __init__(self):
+        self.PropertiesChanged = Signal()
+        self.LinesEdited = Signal()
+        self.reads = 0
+        self.values = {
+            "Reverse": False,
+            "Lines": ["Hello\n"],
+            "Summary": HelloWorldSummary.to_structure(HelloWorldSummary()),
+            "GetLineCount": lambda: 1,
+            "DigestWithTask": lambda algorithm: "/task/1",
+            "InstallWithTasks": lambda: ["/task/2"],
+            "SetReverse": lambda reverse: None,
+        }
+
+    def __getattr__(self, name):
+        if name not in self.__dict__.get("values", {}):
+            raise AttributeError(name)
+
+        self.reads += 1
+        return self.values[name]
+
+    def emit_properties_changed(self, changed, invalidated=()):
+        """Emit PropertiesChanged with a real a{sv} payload.
+
+        The parameters of the signal are unwrapped the same way dasbus
+        unwraps them, so the changed values stay wrapped in variants.
+
+        :param changed: a dictionary of names and variants
+        :param invalidated: a list of names
+        """
+        parameters = get_variant(Tuple[Str, Dict[Str, Variant], List[Str]], (
+            "org.fedoraproject.Anaconda.Addons.HelloWorld",
+            changed,
+            list(invalidated)
+        ))
+        self.PropertiesChanged.emit(*unwrap_variant(parameters))
+
+
+class CachedProxyTestCase(unittest.TestCase):
+    """Test the caching proxy."""
+
+    def setUp(self):
+        self.proxy = FakeProxy()
+        self.cached = CachedProxy(self.proxy, CACHED_PROPERTIES, INVALIDATING_SIGNALS)
+
+    def test_get_property(self):
+        """Test that the properties are read only once."""
+        self.assertEqual(self.cached.Lines, ["Hello\n"])
+        self.assertEqual(self.cached.Lines, ["Hello\n"])
+        self.assertEqual(self.proxy.reads, 1)
+        self.assertEqual((self.cached.hits, self.cached.misses), (1, 1))
+
+    def test_properties_changed(self):
+        """Test that the changed values are unwrapped."""
+        summary = HelloWorldSummary()
+        summary.line_count = 2
+        summary.reverse = True
+        summary.digest = "abc"
+
+        self.proxy.emit_properties_changed({
+            "Reverse": get_variant(Bool, True),
+            "Lines": get_variant(List[Str], ["Hello\n", "world\n"]),
+            "Summary": get_variant(Structure, HelloWorldSummary.to_structure(summary)),
+        })
+
+        self.assertIs(self.cached.Reverse, True)
+        self.assertEqual(self.cached.Lines, ["Hello\n", "world\n"])
+
+        result = HelloWorldSummary.from_structure(self.cached.Summary)
+        self.assertEqual(result.line_count, 2)
+        self.assertEqual(result.reverse, True)
+        self.assertEqual(result.digest, "abc")
+        self.assertEqual(self.proxy.reads, 0)
+
+    def test_properties_invalidated(self):
+        """Test the invalidated properties."""
+        self.assertEqual(self.cached.Reverse, False)
+        self.proxy.values["Reverse"] = True
+        self.proxy.emit_properties_changed({}, ["Reverse"])
+        self.assertEqual(self.cached.Reverse, True)
+        self.assertEqual(self.proxy.reads, 2)
+
+    def test_invalidating_signal(self):
+        """Test the signal that invalidates the lines."""
+        self.assertEqual(self.cached.Lines, ["Hello\n"])
+        self.proxy.values["Lines"] = ["Edited\n"]
+        self.proxy.LinesEdited.emit(0, 1, 1)
+        self.assertEqual(self.cached.Lines, ["Edited\n"])
+
+    def test_other_properties_kept(self):
+        """Test that a change of one property keeps the other cached values."""
+        self.assertEqual(self.cached.Lines, ["Hello\n"])
+        self.proxy.emit_properties_changed({"Reverse": get_variant(Bool, True)})
+        self.assertEqual(self.cached.Lines, ["Hello\n"])
+        self.assertIs(self.cached.Reverse, True)
+        self.assertEqual(self.proxy.reads, 1)
+
+    def test_read_only_methods(self):
+        """Test that the read-only methods keep the cached values."""
+        self.assertEqual(self.cached.Lines, ["Hello\n"])
+        self.assertEqual(self.cached.GetLineCount(), 1)
+        self.assertEqual(self.cached.DigestWithTask("sha256"), "/task/1")
+        self.assertEqual(self.cached.InstallWithTasks(), ["/task/2"])
+        self.assertEqual(self.cached.Lines, ["Hello\n"])
+        self.assertEqual((self.cached.hits, self.cached.misses), (1, 1))
+
+    def test_mutating_methods(self):
+        """Test that the mutating methods drop the cached values."""
+        self.assertEqual(self.cached.Reverse, False)
+        self.proxy.values["Reverse"] = True
+        self.cached.SetReverse(True)
+        self.assertEqual(self.cached.Reverse, True)
+        self.assertEqual((self.cached.hits, self.cached.misses), (0, 2))
@@ -0,0 +1,95 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+import random
+import tempfile
+import unittest
+
+from org_fedora_hello_world.service.digest import LineDigest
+from org_fedora_hello_world.service.line_store import LineStore
+from org_fedora_hello_world.service.source import SourceFile
+from tests.test_line_store import generate_lines
+
+
+class LineDigestTestCase(unittest.TestCase):
+    """Test the digest of lines."""
+
+    def _check_digest(self, digest, store):
+        """Check that the digest is the same as a new digest of the store."""
+        self.assertEqual(digest.hexdigest(), LineDigest(store.encoded).hexdigest())
+
+    def _replace(self, digest, store, start, count, lines):
+        """Replace lines of the store and update the digest."""
+        start, stop = store.get_range(start, count)
+        size = len(store)
+        store.replace(start, stop - start, lines)
+        digest.update(store, start, stop - start, len(store) - size + stop - start)
+
+    def test_empty(self):
+        """Test the digest of no lines."""
+        store = LineStore()
+        digest = LineDigest()
+        self._check_digest(digest, store)
+
+        self._replace(digest, store, 0, 0, ["a\n"])
+        self._check_digest(digest, store)
+
+        self._replace(digest, store, 0, 1, [])
+        self._check_digest(digest, store)
+
+    def test_different(self):
+        """Test that different lines have different digests."""
+        lines = generate_lines(1000)
+        digest = LineDigest(LineStore(lines).encoded).hexdigest()
+
+        lines[500] = "changed\n"
+        self.assertNotEqual(LineDigest(LineStore(lines).encoded).hexdigest(), digest)
+
+    def test_random_edits(self):
+        """Test random edits, appends and deletions."""
+        generator = random.Random(0)
+        store = LineStore(generate_lines(5000))
+        digest = LineDigest(store.encoded)
+
+        for _ in range(200):
+            start = generator.randrange(len(store) + 1)
+            count = generator.randrange(300)
+            new = generate_lines(generator.randrange(300), generator.randrange(10000))
+            self._replace(digest, store, start, count, new)
+            self._check_digest(digest, store)
+
+        self._replace(digest, store, len(store), 0, generate_lines(1000))
+        self._check_digest(digest, store)
+
+        self._replace(digest, store, 0, len(store), [])
+        self._check_digest(digest, store)
+
+    def test_source_file(self):
+        """Test that a source file has the same digest as a line store."""
+        lines = generate_lines(3000) + ["last"]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "source.txt")
+
+            with open(path, "w") as f:
+                f.writelines(lines)
+
+            count, _size, digest, _last = SourceFile(path).describe()
+
+        self.assertEqual(count, len(lines))
+        self.assertEqual(digest, LineDigest(LineStore(lines).encoded).hexdigest())
@@ -0,0 +1,121 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from dasbus.typing import unwrap_variant
+
+from org_fedora_hello_world.constants import HELLO_WORLD_FILE_PATH
+from org_fedora_hello_world.service.hello_world import HelloWorld
+from org_fedora_hello_world.structures import HelloWorldStatistics, HelloWorldValidationRules, \
+    HelloWorldValidationReport
+
+
+class SnapshotTestCase(unittest.TestCase):
+    """Test the snapshots of the lines given to the tasks."""
+
+    def setUp(self):
+        self.service = HelloWorld()
+        self.service.set_lines(["a\n", "b\n", "c\n"])
+
+    def test_snapshot_shared(self):
+        """Test that the snapshot is not a copy."""
+        lines = self.service.lines
+        snapshot = self.service._get_snapshot()  # pylint: disable=protected-access
+        self.assertIs(snapshot, lines)
+
+    def test_snapshot_copied_on_edit(self):
+        """Test that the snapshot is not changed by edits."""
+        snapshot = self.service._get_snapshot()  # pylint: disable=protected-access
+        self.service.replace_lines(1, 1, ["x\n"])
+        self.service.append_lines(["d\n"])
+
+        self.assertEqual(list(snapshot), ["a\n", "b\n", "c\n"])
+        self.assertEqual(list(self.service.lines), ["a\n", "x\n", "c\n", "d\n"])
+        self.assertIsNot(self.service.lines, snapshot)
+
+    def test_edit_without_snapshot(self):
+        """Test that the lines are edited in place without a snapshot."""
+        lines = self.service.lines
+        self.service.append_lines(["d\n"])
+        self.assertIs(self.service.lines, lines)
+
+    def test_task_drops_snapshot(self):
+        """Test that a finished calculation task drops the snapshot."""
+        task = self.service.statistics_with_task()
+        self.service.append_lines(["d\n"])
+
+        result = task.run()
+        statistics = HelloWorldStatistics.from_structure(unwrap_variant(result))
+        self.assertEqual(statistics.line_count, 3)
+        self.assertIsNone(task._lines)  # pylint: disable=protected-access
+
+    def test_validation_task_drops_snapshot(self):
+        """Test that a finished validation task drops the snapshot."""
+        rules = HelloWorldValidationRules()
+        rules.max_line_length = 1
+        task = self.service.validate_with_task(rules)
+        self.service.replace_lines(0, 1, ["too long\n"])
+
+        result = task.run()
+        report = HelloWorldValidationReport.from_structure(unwrap_variant(result))
+        self.assertEqual(report.line_count, 3)
+        self.assertTrue(report.valid)
+        self.assertIsNone(task._lines)  # pylint: disable=protected-access
+
+    @patch("org_fedora_hello_world.service.hello_world.conf")
+    def test_installation_task_drops_snapshot(self, conf):
+        """Test that the installation task writes the snapshot and drops it."""
+        with tempfile.TemporaryDirectory() as sysroot:
+            conf.target.system_root = sysroot
+            task = self.service.install_with_tasks()[0]
+            self.service.append_lines(["d\n"])
+            task.run()
+
+            with open(os.path.join(sysroot, HELLO_WORLD_FILE_PATH)) as f:
+                self.assertEqual(f.read(), "a\nb\nc\n")
+
+        self.assertIsNone(task._lines)  # pylint: disable=protected-access
+
+    def test_source_clears_lines(self):
+        """Test that the lines are cleared when the source is set."""
+        with tempfile.NamedTemporaryFile("w") as f:
+            f.write("source\n")
+            f.flush()
+
+            self.service.set_source(f.name)
+            configuration = self.service.get_configuration()
+
+        self.assertEqual(configuration.lines, [])
+        self.assertEqual(configuration.source, f.name)
+        self.assertEqual(self.service.summary.line_count, 1)
+
+    def test_reverse_preview(self):
+        """Test the reversed lines of the lines and of the source."""
+        task = self.service.reverse_preview_with_task(2)
+        self.assertEqual(task.run().unpack(), ["c\n", "b\n"])
+
+        with tempfile.NamedTemporaryFile("wb") as f:
+            f.write(b"a\x0cb\n\xc3\xa9\xc2\x85\xe2\x80\xa8\nc")
+            f.flush()
+
+            self.service.set_source(f.name)
+            task = self.service.reverse_preview_with_task(5)
+            self.assertEqual(task.run().unpack(), ["c\n", "\xe9\x85\u2028\n", "a\x0cb\n"])
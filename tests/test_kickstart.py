@@ -0,0 +1,83 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import unittest
+
+from pykickstart.errors import KickstartParseError
+
+from org_fedora_hello_world.constants import KICKSTART_BATCH_LINES
+from org_fedora_hello_world.service.kickstart import HelloWorldData
+from tests.test_line_store import generate_lines
+
+
+class HelloWorldDataTestCase(unittest.TestCase):
+    """Test the kickstart data."""
+
+    def _parse_section(self, data, args, lines, line_number=1):
+        """Parse one %addon section the way pykickstart does."""
+        data.handle_header(args, line_number)
+
+        for number, line in enumerate(lines, line_number + 1):
+            data.handle_line(line, number)
+
+        data.handle_end()
+
+    def test_lines(self):
+        """Test the lines of the section."""
+        data = HelloWorldData()
+        data.handle_header([], 1)
+        data.handle_line("a\n", 2)
+        data.handle_line("b\n", 3)
+        self.assertEqual(list(data.lines), [])
+
+        data.handle_end()
+        self.assertEqual(list(data.lines), ["a\n", "b\n"])
+
+    def test_batches(self):
+        """Test the lines stored in batches."""
+        lines = generate_lines(KICKSTART_BATCH_LINES + 1)
+        data = HelloWorldData()
+        data.handle_header([], 1)
+
+        for number, line in enumerate(lines, 2):
+            data.handle_line(line, number)
+
+        self.assertEqual(list(data.lines), lines[:KICKSTART_BATCH_LINES])
+
+        data.handle_end()
+        self.assertEqual(list(data.lines), lines)
+
+    def test_sections(self):
+        """Test the lines of multiple sections."""
+        data = HelloWorldData()
+        self._parse_section(data, ["--reverse"], ["a\n", "b\n"])
+        self._parse_section(data, ["--target=/etc/hello.conf"], ["c\n"], 5)
+        self.assertTrue(data.reverse)
+        self.assertEqual(list(data.lines), ["a\n", "b\n"])
+        self.assertEqual(list(data.files["etc/hello.conf"]), ["c\n"])
+
+    def test_source(self):
+        """Test the section with the --source option."""
+        data = HelloWorldData()
+        self._parse_section(data, ["--source=/run/install/hello.txt"], ["\n", "  \n"])
+        self.assertEqual(data.source, "/run/install/hello.txt")
+        self.assertEqual(list(data.lines), [])
+
+        with self.assertRaises(KickstartParseError) as cm:
+            self._parse_section(data, ["--source=/run/install/hello.txt"], ["\n", "a\n"], 10)
+
+        self.assertEqual(cm.exception.lineno, 12)
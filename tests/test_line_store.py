@@ -0,0 +1,194 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import random
+import unittest
+
+from org_fedora_hello_world.constants import COMPRESSION_ZLIB, COMPRESSION_LZMA
+from org_fedora_hello_world.service.line_store import LineStore, CompressedLineStore
+
+
+def generate_lines(count, start=0):
+    """Generate lines of different lengths and characters."""
+    return ["{} {}\n".format("héllo" * (i % 7), i) for i in range(start, start + count)]
+
+
+class LineStoreTestCase(unittest.TestCase):
+    """Test the line store against a list of strings."""
+
+    def _create_store(self, lines=()):
+        """Create the tested store."""
+        return LineStore(lines)
+
+    def _check_store(self, store, lines):
+        """Check that the store contains the given lines."""
+        encoded = "".join(lines).encode("utf-8")
+        self.assertEqual(len(store), len(lines))
+        self.assertEqual(list(store), lines)
+        self.assertEqual(list(reversed(store)), lines[::-1])
+        self.assertEqual(store.nbytes, len(encoded))
+        self.assertEqual(b"".join(store.iterate_blocks()), encoded)
+
+    def test_empty(self):
+        """Test an empty store."""
+        store = self._create_store()
+        self._check_store(store, [])
+        self.assertEqual(store[0:10], [])
+        self.assertEqual(b"".join(store.iterate_blocks(5)), b"")
+
+        with self.assertRaises(IndexError):
+            store[0]  # pylint: disable=pointless-statement
+
+    def test_indexing(self):
+        """Test indexing of lines."""
+        lines = generate_lines(100)
+        store = self._create_store(lines)
+        self._check_store(store, lines)
+
+        for index in (0, 1, 50, 99, -1, -100):
+            self.assertEqual(store[index], lines[index])
+            self.assertEqual(store.get_encoded(index), lines[index].encode("utf-8"))
+
+        for index in (100, -101):
+            with self.assertRaises(IndexError):
+                store[index]  # pylint: disable=pointless-statement
+
+    def test_slicing(self):
+        """Test slicing of lines."""
+        lines = generate_lines(100)
+        store = self._create_store(lines)
+
+        for index in (slice(None), slice(10, 20), slice(-5, None), slice(90, 200),
+                      slice(50, 10), slice(None, None, 3), slice(None, None, -1),
+                      slice(-200, 5), slice(80, 20, -7)):
+            self.assertEqual(store[index], lines[index], index)
+
+    def test_replace(self):
+        """Test replacing of ranges of lines."""
+        lines = generate_lines(50)
+        store = self._create_store(lines)
+
+        for start, count, new in ((0, 0, ["a\n"]), (10, 5, []), (20, 1, ["b\n", "c\n"]),
+                                  (0, 3, generate_lines(10, 1000)), (len(lines), 0, ["d"]),
+                                  (-5, 2, ["e\n"]), (40, 100, ["f\n"]), (500, 5, ["g\n"])):
+            # The range is clamped to the existing lines.
+            first, stop = store.get_range(start, count)
+            store.replace(start, count, new)
+            lines[first:stop] = new
+            self._check_store(store, lines)
+
+    def test_edits(self):
+        """Test insertions, deletions and appends."""
+        lines = generate_lines(20)
+        store = self._create_store(lines)
+
+        store.insert(5, ["x\n", "y\n"])
+        lines[5:5] = ["x\n", "y\n"]
+        store.delete(0, 3)
+        del lines[0:3]
+        store.append("z\n")
+        lines.append("z\n")
+        store.extend(generate_lines(5, 100))
+        lines.extend(generate_lines(5, 100))
+
+        self._check_store(store, lines)
+
+    def test_random_edits(self):
+        """Test random edits."""
+        generator = random.Random(0)
+        lines = generate_lines(200)
+        store = self._create_store(lines)
+
+        for _ in range(200):
+            start = generator.randrange(len(lines) + 1)
+            count = generator.randrange(10)
+            new = generate_lines(generator.randrange(10), generator.randrange(1000))
+            store.replace(start, count, new)
+            lines[start:start + count] = new
+
+        self._check_store(store, lines)
+
+    def test_iterate_blocks(self):
+        """Test iteration over blocks from an offset."""
+        lines = generate_lines(1000)
+        store = self._create_store(lines)
+        encoded = "".join(lines).encode("utf-8")
+
+        for offset in (0, 1, 100, len(encoded) // 2, len(encoded) - 1, len(encoded),
+                       len(encoded) + 10):
+            self.assertEqual(b"".join(store.iterate_blocks(offset)), encoded[offset:])
+
+    def test_get_range(self):
+        """Test clamping of ranges."""
+        store = self._create_store(generate_lines(10))
+        self.assertEqual(store.get_range(0, 5), (0, 5))
+        self.assertEqual(store.get_range(8, 5), (8, 10))
+        self.assertEqual(store.get_range(-3, 5), (0, 5))
+        self.assertEqual(store.get_range(20, 5), (10, 10))
+        self.assertEqual(store.get_range(3, -1), (3, 3))
+
+    def test_copy(self):
+        """Test that a copy is independent of the store."""
+        lines = generate_lines(500)
+        store = self._create_store(lines)
+        copy = store.copy()
+        self.assertIsInstance(copy, type(store))
+        self._check_store(copy, lines)
+
+        store.replace(10, 100, ["changed\n"])
+        store.extend(["appended\n"])
+        self._check_store(copy, lines)
+
+        copy.delete(0, 250)
+        self.assertEqual(len(store), 402)
+        self._check_store(copy, lines[250:])
+
+    def test_missing_line_ending(self):
+        """Test the last line without the line ending."""
+        store = self._create_store(["a\n", "b"])
+        self._check_store(store, ["a\n", "b"])
+        self.assertEqual(store[-1], "b")
+
+
+class ZlibLineStoreTestCase(LineStoreTestCase):
+    """Test the zlib compressed line store against a list of strings."""
+
+    def _create_store(self, lines=()):
+        # Use small blocks, so the tests cross many blocks.
+        return CompressedLineStore(lines, method=COMPRESSION_ZLIB, block_size=256)
+
+
+class LzmaLineStoreTestCase(LineStoreTestCase):
+    """Test the lzma compressed line store against a list of strings."""
+
+    def _create_store(self, lines=()):
+        return CompressedLineStore(lines, method=COMPRESSION_LZMA, block_size=1024)
+
+
+class FromEncodedTestCase(unittest.TestCase):
+    """Test creating of line stores from the encoded text."""
+
+    def test_from_encoded(self):
+        """Test splitting of the encoded text."""
+        for text in ("", "a\n", "a\nb", "a\n\nb\n", "\n\n"):
+            store = LineStore.from_encoded(text.encode("utf-8"))
+            self.assertEqual(list(store), text.splitlines(keepends=True))
+
+    def test_invalid(self):
+        """Test the invalid encoded text."""
+        with self.assertRaises(UnicodeDecodeError):
+            LineStore.from_encoded(b"a\n\xff\n")
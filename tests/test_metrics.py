@@ -0,0 +1,102 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import unittest
+
+from dasbus.server.interface import dbus_signal
+from dasbus.typing import *  # pylint: disable=wildcard-import,unused-wildcard-import
+
+from org_fedora_hello_world.service.metrics import metrics, instrument_interface
+
+
+class ParentInterface:
+    """A parent interface with inherited members."""
+
+    def ReadKickstart(self, kickstart: Str) -> Str:
+        """Read the kickstart."""
+        return kickstart
+
+    def GenerateKickstart(self) -> Str:
+        """Generate the kickstart."""
+        return "%addon\n%end\n"
+
+    def Overridden(self) -> Int:
+        """Return a number."""
+        return 1
+
+
+@instrument_interface
+class ChildInterface(ParentInterface):
+    """A child interface with its own members."""
+
+    @property
+    def Lines(self) -> List[Str]:
+        """The lines."""
+        return ["Hello\n"]
+
+    def Overridden(self) -> Int:
+        """Return another number."""
+        return 2
+
+    @dbus_signal
+    def LinesEdited(self, start: Int, removed: Int, added: Int):
+        """The lines are edited."""
+
+    def helper(self):
+        """Return a value not exported on D-Bus."""
+        return None
+
+
+class InstrumentInterfaceTestCase(unittest.TestCase):
+    """Test the measured interface classes."""
+
+    def setUp(self):
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.reset()
+
+    def test_members(self):
+        """Test the measured members of the interface."""
+        interface = ChildInterface()
+        self.assertEqual(interface.ReadKickstart("text"), "text")
+        self.assertEqual(interface.GenerateKickstart(), "%addon\n%end\n")
+        self.assertEqual(interface.Overridden(), 2)
+        self.assertEqual(interface.Lines, ["Hello\n"])
+        interface.helper()
+
+        self.assertEqual(sorted(metrics.get_metrics()), [
+            "ChildInterface.GenerateKickstart",
+            "ChildInterface.Lines",
+            "ChildInterface.Overridden",
+            "ChildInterface.ReadKickstart",
+        ])
+
+    def test_parent_unchanged(self):
+        """Test that the members of the parent class are not measured."""
+        interface = ParentInterface()
+        interface.ReadKickstart("text")
+        interface.Overridden()
+        self.assertEqual(metrics.get_metrics(), {})
+
+    def test_annotations(self):
+        """Test that the inherited members keep their annotations."""
+        self.assertEqual(
+            ChildInterface.ReadKickstart.__annotations__,
+            {"kickstart": Str, "return": Str}
+        )
+        self.assertIsInstance(vars(ChildInterface)["LinesEdited"], dbus_signal)
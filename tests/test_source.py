@@ -0,0 +1,56 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+import tempfile
+import unittest
+
+from org_fedora_hello_world.service.source import SourceFile
+from tests.test_line_store import generate_lines
+
+
+class SourceFileTestCase(unittest.TestCase):
+    """Test the source file."""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._directory.name, "source.txt")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _create_source(self, data):
+        """Create a source file with the given bytes."""
+        with open(self.path, "wb") as f:
+            f.write(data)
+
+        return SourceFile(self.path)
+
+    def test_reversed(self):
+        """Test the reversed lines."""
+        for data in (b"", b"a", b"a\n", b"a\nb", b"a\nb\n", b"\n\n", b"a\x0cb\r\nc\x85\n"):
+            source = self._create_source(data)
+            self.assertEqual(list(reversed(source)), list(source)[::-1], data)
+
+    def test_reversed_regions(self):
+        """Test the reversed lines of a file with many regions."""
+        data = "".join(generate_lines(100000)).encode("utf-8") + b"last"
+        source = self._create_source(data)
+        lines = list(source)
+        self.assertGreater(len(list(source.iterate_reversed_blocks())), 1)
+        self.assertEqual(list(reversed(source)), lines[::-1])
+        self.assertEqual(lines[-1], b"last")
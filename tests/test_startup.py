@@ -0,0 +1,61 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+from org_fedora_hello_world.constants import HELLO_WORLD
+from org_fedora_hello_world.service.hello_world import HelloWorld, get_process_age
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StartupTestCase(unittest.TestCase):
+    """Test the startup of the service."""
+
+    @patch("org_fedora_hello_world.service.hello_world.TaskContainer")
+    @patch("org_fedora_hello_world.service.hello_world.DBus")
+    def test_startup_time(self, dbus, container):  # pylint: disable=unused-argument
+        """Test the time from the process start to the acquired bus name."""
+        service = HelloWorld()
+        self.assertIsNone(service.startup_time)
+
+        service.publish()
+        dbus.register_service.assert_called_once_with(HELLO_WORLD.service_name)
+
+        self.assertGreater(service.startup_time, 0)
+        self.assertLessEqual(service.startup_time, get_process_age())
+
+    def test_lazy_imports(self):
+        """Test that the kickstart and task modules are not imported up front."""
+        output = subprocess.run(
+            [sys.executable, "-c",
+             "import sys; import org_fedora_hello_world.service.hello_world; "
+             "print('\\n'.join(sys.modules))"],
+            cwd=REPOSITORY,
+            stdout=subprocess.PIPE,
+            check=True,
+            universal_newlines=True
+        ).stdout
+
+        modules = output.split()
+        self.assertIn("org_fedora_hello_world.service.hello_world", modules)
+        self.assertNotIn("org_fedora_hello_world.service.kickstart", modules)
+        self.assertNotIn("org_fedora_hello_world.service.installation", modules)
@@ -0,0 +1,350 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import errno
+import mmap
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from org_fedora_hello_world.constants import FSYNC_NONE, FSYNC_FILE, FSYNC_FULL
+from org_fedora_hello_world.service.line_store import LineStore, CompressedLineStore
+from org_fedora_hello_world.service.source import SourceFile
+from org_fedora_hello_world.service.writer import FileWriter
+from tests.test_line_store import generate_lines
+
+
+class FileWriterTestCase(unittest.TestCase):
+    """Test the writer of files."""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+        self.path = os.path.join(self.directory, "hello_world.txt")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _read(self, path=None):
+        """Read the written file."""
+        with open(path or self.path, "rb") as f:
+            return f.read()
+
+    def _write_file(self, data, path=None):
+        """Write the given bytes into a file."""
+        with open(path or self.path, "wb") as f:
+            f.write(data)
+
+    def test_write_lines(self):
+        """Test writing of lines of different types."""
+        lines = generate_lines(1000)
+        encoded = "".join(lines).encode("utf-8")
+
+        # Use a small buffer, so the lines are written in many batches.
+        writer = FileWriter(self.path, buffer_size=100, fsync_policy=FSYNC_NONE)
+
+        for value in (lines, LineStore(lines), CompressedLineStore(lines, block_size=256)):
+            self.assertEqual(writer.write_lines(value), len(encoded))
+            self.assertEqual(self._read(), encoded)
+
+    def test_write_reversed(self):
+        """Test writing of reversed lines."""
+        writer = FileWriter(self.path, fsync_policy=FSYNC_NONE)
+
+        for lines, expected in (([], b""), (["a\n", "b\n"], b"b\na\n"),
+                                (["a\n", "b"], b"b\na\n"), (["a"], b"a\n")):
+            for value in (lines, LineStore(lines), CompressedLineStore(lines, block_size=2)):
+                writer.write_lines(value, reverse=True)
+                self.assertEqual(self._read(), expected, value)
+
+    def test_missing_line_ending(self):
+        """Test that the last line is terminated and the lines are not changed."""
+        lines = ["a\n", "b"]
+        writer = FileWriter(self.path, fsync_policy=FSYNC_NONE)
+
+        for value in (lines, LineStore(lines)):
+            self.assertEqual(writer.write_lines(value), 4)
+            self.assertEqual(self._read(), b"a\nb\n")
+
+        self.assertEqual(lines, ["a\n", "b"])
+
+    def test_replace_file(self):
+        """Test that the target file is replaced and keeps its mode."""
+        self._write_file(b"old\n")
+        os.chmod(self.path, 0o600)
+
+        writer = FileWriter(self.path, fsync_policy=FSYNC_NONE)
+        writer.write_lines(["new\n"])
+
+        self.assertEqual(self._read(), b"new\n")
+        self.assertEqual(os.stat(self.path).st_mode & 0o7777, 0o600)
+        self.assertEqual(os.listdir(self.directory), ["hello_world.txt"])
+
+    def test_new_file_mode(self):
+        """Test the mode of a new file."""
+        FileWriter(self.path, fsync_policy=FSYNC_NONE).write_lines(["new\n"])
+        self.assertEqual(os.stat(self.path).st_mode & 0o7777, 0o644)
+
+    def test_failed_write(self):
+        """Test that a failed write keeps the target file and removes the temporary file."""
+        self._write_file(b"old\n")
+
+        def _fail():
+            yield b"new\n"
+            raise OSError("Fake error.")
+
+        writer = FileWriter(self.path, buffer_size=1, fsync_policy=FSYNC_NONE)
+
+        with self.assertRaises(OSError):
+            writer.write(_fail())
+
+        self.assertEqual(self._read(), b"old\n")
+        self.assertEqual(os.listdir(self.directory), ["hello_world.txt"])
+
+    def test_failed_replace(self):
+        """Test that the temporary file is removed if the target can't be replaced."""
+        os.mkdir(self.path)
+        writer = FileWriter(self.path, fsync_policy=FSYNC_NONE)
+
+        with self.assertRaises(OSError):
+            writer.write_lines(["new\n"])
+
+        self.assertEqual(os.listdir(self.directory), ["hello_world.txt"])
+        self.assertTrue(os.path.isdir(self.path))
+
+    def test_fsync_policies(self):
+        """Test the fsync policies."""
+        for policy, file_syncs, directory_syncs in ((FSYNC_NONE, 0, 0), (FSYNC_FILE, 1, 0),
+                                                    (FSYNC_FULL, 1, 1)):
+            writer = FileWriter(self.path, fsync_policy=policy)
+
+            with patch("os.fsync") as fsync, \
+                    patch.object(FileWriter, "_sync_directory") as sync_directory:
+                writer.write_lines(["a\n"])
+
+            self.assertEqual(fsync.call_count, file_syncs, policy)
+            self.assertEqual(sync_directory.call_count, directory_syncs, policy)
+
+        self.assertEqual(self._read(), b"a\n")
+
+    def test_sync_directory(self):
+        """Test the synchronization of the directory."""
+        with patch("os.fsync") as fsync:
+            FileWriter(self.path, fsync_policy=FSYNC_FULL).write_lines(["a\n"])
+
+        self.assertEqual(fsync.call_count, 2)
+
+    def test_invalid_arguments(self):
+        """Test the invalid arguments of the writer."""
+        with self.assertRaises(ValueError):
+            FileWriter(self.path, buffer_size=0)
+
+        with self.assertRaises(ValueError):
+            FileWriter(self.path, fsync_policy="invalid")
+
+    def test_progress(self):
+        """Test the reported progress."""
+        sizes = []
+        writer = FileWriter(self.path, buffer_size=10, fsync_policy=FSYNC_NONE,
+                            progress_callback=sizes.append)
+        size = writer.write_lines(generate_lines(100))
+
+        self.assertGreater(len(sizes), 1)
+        self.assertEqual(sum(sizes), size)
+
+    def test_partial_write(self):
+        """Test that a partial vectored write is finished."""
+        real_writev = os.writev
+
+        def _writev(fd, buffers):
+            return real_writev(fd, [b"".join(buffers)[:3]])
+
+        writer = FileWriter(self.path, fsync_policy=FSYNC_NONE)
+
+        with patch("os.writev", side_effect=_writev):
+            writer.write_lines(["hello\n", "world\n"])
+
+        self.assertEqual(self._read(), b"hello\nworld\n")
+
+    def test_is_unchanged(self):
+        """Test the comparison of the planned content with the target file."""
+        lines = generate_lines(1000)
+        writer = FileWriter(self.path, buffer_size=100, fsync_policy=FSYNC_NONE)
+        self.assertFalse(writer.is_unchanged(lines))
+
+        for value in (lines, LineStore(lines), CompressedLineStore(lines, block_size=256)):
+            writer.write_lines(value)
+            self.assertTrue(writer.is_unchanged(value))
+            self.assertFalse(writer.is_unchanged(value, reverse=True))
+
+            writer.write_lines(value, reverse=True)
+            self.assertTrue(writer.is_unchanged(value, reverse=True))
+            self.assertFalse(writer.is_unchanged(value))
+
+    def test_is_changed(self):
+        """Test the detection of changed content."""
+        writer = FileWriter(self.path, fsync_policy=FSYNC_NONE)
+
+        for data in (b"a\nb\n", b"a\nc\n", b"a\nb\nc\n", b"a\n", b"", b"a\nb"):
+            self._write_file(data)
+
+            for value in (["a\n", "b\n"], LineStore(["a\n", "b\n"])):
+                self.assertEqual(writer.is_unchanged(value), data == b"a\nb\n", data)
+
+    def test_is_unchanged_missing_line_ending(self):
+        """Test the comparison with the terminated last line."""
+        self._write_file(b"a\nb\n")
+        writer = FileWriter(self.path, fsync_policy=FSYNC_NONE)
+
+        for value in (["a\n", "b"], LineStore(["a\n", "b"])):
+            self.assertTrue(writer.is_unchanged(value))
+
+    def test_is_unchanged_size(self):
+        """Test that the content is not read if the sizes are different."""
+        self._write_file(b"a\nb\nc\n")
+        writer = FileWriter(self.path, fsync_policy=FSYNC_NONE)
+
+        with patch.object(FileWriter, "_iterate_blocks") as iterate_blocks:
+            self.assertFalse(writer.is_unchanged(LineStore(["a\n", "b\n"])))
+
+        iterate_blocks.assert_not_called()
+
+
+class SourceCopyTestCase(unittest.TestCase):
+    """Test copying of source files by the writer."""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+        self.path = os.path.join(self.directory, "hello_world.txt")
+        self.source_path = os.path.join(self.directory, "source.txt")
+        self.data = "".join(generate_lines(1000)).encode("utf-8")
+
+        with open(self.source_path, "wb") as f:
+            f.write(self.data)
+
+        # Use a small buffer, so the data are copied in many chunks.
+        self.writer = FileWriter(self.path, buffer_size=1000, fsync_policy=FSYNC_NONE)
+        self.source = SourceFile(self.source_path)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _read(self):
+        """Read the written file."""
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def _check_copy(self):
+        """Copy the source file and check the target file."""
+        self.assertEqual(self.writer.write_lines(self.source), len(self.data))
+        self.assertEqual(self._read(), self.data)
+        self.assertTrue(self.writer.is_unchanged(self.source))
+
+    def test_copy_file_range(self):
+        """Test copying with copy_file_range."""
+        if not hasattr(os, "copy_file_range"):
+            self.skipTest("The copy_file_range function is not available.")
+
+        with patch("os.copy_file_range", wraps=os.copy_file_range) as copy_file_range, \
+                patch("os.sendfile") as sendfile:
+            self._check_copy()
+
+        self.assertGreater(copy_file_range.call_count, 1)
+        sendfile.assert_not_called()
+
+    def test_sendfile(self):
+        """Test the fallback to sendfile."""
+        with patch("os.copy_file_range", create=True,
+                   side_effect=OSError(errno.EXDEV, "Fake error.")), \
+                patch("os.sendfile", wraps=os.sendfile) as sendfile, \
+                patch("mmap.mmap") as mapped:
+            self._check_copy()
+
+        self.assertGreater(sendfile.call_count, 1)
+        mapped.assert_not_called()
+
+    def test_mapped(self):
+        """Test the fallback to the mapped file."""
+        with patch("os.copy_file_range", create=True,
+                   side_effect=OSError(errno.EXDEV, "Fake error.")), \
+                patch("os.sendfile", side_effect=OSError(errno.ENOSYS, "Fake error.")), \
+                patch("mmap.mmap", wraps=mmap.mmap) as mapped:
+            self._check_copy()
+
+        mapped.assert_called_once()
+
+    def test_unexpected_error(self):
+        """Test that other errors are not ignored."""
+        with patch("os.copy_file_range", create=True,
+                   side_effect=OSError(errno.EIO, "Fake error.")), \
+                self.assertRaises(OSError):
+            self.writer.write_lines(self.source)
+
+        self.assertEqual(os.listdir(self.directory), ["source.txt"])
+
+    def test_error_after_copy(self):
+        """Test that there is no fallback after a part of the data is copied."""
+        calls = []
+        real_sendfile = os.sendfile
+
+        def _sendfile(*args):
+            if calls:
+                raise OSError(errno.EXDEV, "Fake error.")
+
+            calls.append(args)
+            return real_sendfile(*args)
+
+        with patch("os.copy_file_range", create=True,
+                   side_effect=OSError(errno.ENOSYS, "Fake error.")), \
+                patch("os.sendfile", side_effect=_sendfile), \
+                self.assertRaises(OSError):
+            self.writer.write_lines(self.source)
+
+        self.assertEqual(os.listdir(self.directory), ["source.txt"])
+
+    def test_missing_line_ending(self):
+        """Test that the last line of the copy is terminated."""
+        with open(self.source_path, "ab") as f:
+            f.write(b"last")
+
+        self.assertEqual(self.writer.write_lines(self.source), len(self.data) + 5)
+        self.assertEqual(self._read(), self.data + b"last\n")
+        self.assertTrue(self.writer.is_unchanged(self.source))
+
+    def test_empty(self):
+        """Test copying of an empty file."""
+        with open(self.source_path, "wb"):
+            pass
+
+        self.assertEqual(self.writer.write_lines(self.source), 0)
+        self.assertEqual(self._read(), b"")
+
+    def test_reversed(self):
+        """Test writing of the reversed source file."""
+        with open(self.source_path, "ab") as f:
+            f.write(b"last")
+
+        lines = list(SourceFile(self.source_path))
+        lines[-1] += b"\n"
+        expected = b"".join(reversed(lines))
+
+        writer = FileWriter(self.path, buffer_size=100, fsync_policy=FSYNC_NONE)
+        self.assertEqual(writer.write_lines(self.source, reverse=True), len(expected))
+        self.assertEqual(self._read(), expected)
+        self.assertTrue(writer.is_unchanged(self.source, reverse=True))